@@ -0,0 +1,256 @@
+import time
+
+START_TIME = time.perf_counter()
+
+import os
+import sys
+import ast
+import argparse
+import tempfile
+import importlib
+
+# Heavy modules (pygame, numpy, matplotlib) are only imported by the subcommand that needs them
+import config
+
+# Mirror logs.metrics_stream.DEFAULT_SOCKET_PATH, models.snapshot_buffer.DEFAULT_BUFFER_NAME and
+# the keys of machine_learning.agents.AGENT_CLASSES without importing them at startup
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "self_driving_ai_metrics.sock")
+DEFAULT_BUFFER_NAME = "self_driving_ai_spectator"
+AGENT_TYPES = ["Q_LEARNING", "DYNA_Q", "Q_LAMBDA", "TILE_CODING"]
+
+
+def report_timing(label, start):
+    """Print the time elapsed since start to stderr, so it never mixes with command output."""
+    print(f"[{label}] {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+
+
+def import_timed(*module_names):
+    """
+    Import the given modules and report how long it took.
+
+    Returns:
+        list: The imported modules, in the same order.
+    """
+    start = time.perf_counter()
+    modules = [importlib.import_module(name) for name in module_names]
+    report_timing(f"imports: {', '.join(module_names)}", start)
+    return modules
+
+
+def parse_override(override):
+    """
+    Parse a "SECTION.KEY=VALUE" config override.
+
+    SECTION is the name of a config dict, with or without its "_CONFIG" suffix (e.g. "QL.LEARNING_RATE=0.2").
+    VALUE is parsed as a Python literal when possible and kept as a string otherwise.
+
+    Returns:
+        tuple: (section_dict, key, value)
+    """
+    try:
+        name, value = override.split("=", 1)
+        section_name, key = name.split(".", 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Override '{override}' is not in the form SECTION.KEY=VALUE.")
+
+    section_name = section_name.upper()
+    if not section_name.endswith("_CONFIG"):
+        section_name += "_CONFIG"
+    section = getattr(config, section_name, None)
+    if not isinstance(section, dict) or key not in section:
+        raise argparse.ArgumentTypeError(f"Unknown config option '{section_name}.{key}'.")
+
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return section, key, value
+
+
+def apply_overrides(args):
+    """Apply the session flags and --set overrides to the config dicts, in place."""
+    flags = [
+        (config.SESSION_CONFIG, "NUM_EPISODES", args.episodes),
+        (config.SESSION_CONFIG, "EPISODE_DURATION", args.duration),
+        (config.SESSION_CONFIG, "SEED", args.seed),
+        (config.SESSION_CONFIG, "HEADLESS", True if args.headless else None),
+        (config.QL_CONFIG, "AGENT", args.agent),
+        (config.QL_CONFIG, "Q_TABLE_FILENAME", args.q_table),
+        (config.QL_CONFIG, "DECISION_INTERVAL", args.decision_interval),
+        (config.CIRCUIT_CONFIG, "TRACK_ID", args.track),
+        (config.SESSION_CONFIG, "METRICS_SOCKET", args.metrics_socket),
+        (config.SESSION_CONFIG, "SPECTATOR_BUFFER", args.spectate)
+    ]
+    for section, key, value in flags:
+        if value is not None:
+            section[key] = value
+    for section, key, value in args.overrides:
+        section[key] = value
+
+
+def run_session(args, training):
+    """Run main.py's session loop in training or evaluation mode."""
+    config.SESSION_CONFIG["TRAINING_MODE"] = training
+    config.SESSION_CONFIG["MANUAL_CONTROL"] = False
+    apply_overrides(args)
+
+    # Evaluation without saved knowledge fails fast, before pygame is even imported
+    if not training:
+        agents, = import_timed("machine_learning.agents")
+        q_table_path = agents.create_agent(6, 4).q_table_path
+        if not os.path.exists(q_table_path):
+            print(f"No saved {config.QL_CONFIG['AGENT']} agent found at {q_table_path}; nothing to evaluate.")
+            return 1
+
+    main, = import_timed("main")
+    report_timing("startup", START_TIME)
+    main.main()
+
+
+def command_train(args):
+    return run_session(args, training=True)
+
+
+def command_eval(args):
+    return run_session(args, training=False)
+
+
+def command_bench(args):
+    benchmark, = import_timed("machine_learning.q_learning.benchmark_convergence")
+    report_timing("startup", START_TIME)
+    benchmark.main(args.args)
+
+
+def command_plot(args):
+    if args.live:
+        live_plot, = import_timed("visualization.live_plot")
+        report_timing("startup", START_TIME)
+        try:
+            grapher = live_plot.LiveGrapher(args.socket, args.window)
+        except FileExistsError as error:
+            print(error)
+            return 1
+        print(f"Listening for training metrics on {args.socket}")
+        grapher.show()
+        return
+
+    grapher_module, logger = import_timed("visualization.grapher", "logs.logger")
+    agent = args.agent or config.QL_CONFIG["AGENT"]
+    discretizer = args.discretizer or config.QL_CONFIG["DISCRETIZER"]
+    log_file = args.log or os.path.join(
+        "logs", "q_learning", logger.get_log_name(config.QL_CONFIG["Q_TABLE_FILENAME"], agent, discretizer) + ".txt"
+    )
+    grapher = grapher_module.Grapher(log_file)
+    report_timing("startup", START_TIME)
+
+    if args.kind == "progress":
+        grapher.read_log()
+        grapher.plot_progress()
+    else:
+        grapher.plot_exploration_rate_decay(config.QL_CONFIG["MIN_EXPLORATION_RATE"],
+                                            config.QL_CONFIG["EXPLORATION_DECAY"])
+
+
+def command_export(args):
+    replay, = import_timed("visualization.replay_episode")
+    report_timing("startup", START_TIME)
+    return replay.main(args.args)
+
+
+def command_conform(args):
+    conformance, = import_timed("models.conformance")
+    report_timing("startup", START_TIME)
+    return conformance.main(args.args)
+
+
+def command_policy(args):
+    policy_server, = import_timed("machine_learning.policy_server")
+    report_timing("startup", START_TIME)
+    policy_server.main(args.args)
+
+
+def command_view(args):
+    spectator, = import_timed("visualization.spectator")
+    report_timing("startup", START_TIME)
+    spectator.watch(args.name, args.fps)
+
+
+def add_session_arguments(parser):
+    """Add the flags shared by train and eval."""
+    parser.add_argument("--episodes", type=int, help="Number of episodes to run.")
+    parser.add_argument("--duration", type=float, help="Episode duration in seconds.")
+    parser.add_argument("--seed", type=int, help="Base random seed.")
+    parser.add_argument("--headless", action="store_true", help="Run without a window, on simulated time.")
+    parser.add_argument("--agent", choices=AGENT_TYPES, help="Agent type (see QL_CONFIG['AGENT']).")
+    parser.add_argument("--q-table", help="Q-table filename inside machine_learning/q_learning/q_tables.")
+    parser.add_argument("--decision-interval", type=int, help="Physics steps per agent decision.")
+    parser.add_argument("--track", type=int, help="Circuit ID to load.")
+    parser.add_argument("--metrics-socket", nargs="?", const=DEFAULT_SOCKET_PATH,
+                        help="Stream per-episode metrics to a live plotter (default socket if no path is given).")
+    parser.add_argument("--spectate", nargs="?", const=DEFAULT_BUFFER_NAME,
+                        help="Publish vehicle snapshots for 'cli.py view' (default buffer if no name is given).")
+    parser.add_argument("--set", dest="overrides", type=parse_override, action="append", default=[],
+                        metavar="SECTION.KEY=VALUE", help="Override any config.py option, e.g. QL.LEARNING_RATE=0.2.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Self-driving car simulation command line.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train the agent.")
+    add_session_arguments(train_parser)
+    train_parser.set_defaults(handler=command_train)
+
+    eval_parser = subparsers.add_parser("eval", help="Evaluate a saved Q-table without exploration.")
+    add_session_arguments(eval_parser)
+    eval_parser.set_defaults(handler=command_eval)
+
+    # bench and export forward their remaining arguments to the underlying scripts
+    bench_parser = subparsers.add_parser("bench", help="Run the headless convergence benchmark.",
+                                         description="Arguments are forwarded to benchmark_convergence.py.")
+    bench_parser.set_defaults(handler=command_bench, forwards_arguments=True)
+
+    plot_parser = subparsers.add_parser("plot", help="Plot training logs.")
+    plot_parser.add_argument("kind", nargs="?", choices=["progress", "exploration"], default="progress")
+    plot_parser.add_argument("--log", help="Log file to plot. Defaults to the configured Q-table's log.")
+    plot_parser.add_argument("--agent", choices=AGENT_TYPES, help="Agent type whose default log is plotted (see QL_CONFIG['AGENT']).")
+    plot_parser.add_argument("--discretizer", choices=["FIXED", "ADAPTIVE"],
+                             help="Discretizer whose default log is plotted (see QL_CONFIG['DISCRETIZER']).")
+    plot_parser.add_argument("--live", action="store_true", help="Plot metrics streamed by running trainers.")
+    plot_parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Socket the trainers publish to (--live).")
+    plot_parser.add_argument("--window", type=int, default=500, help="Episodes kept per run (--live).")
+    plot_parser.set_defaults(handler=command_plot)
+
+    export_parser = subparsers.add_parser("export", help="Replay archived episodes or export them.",
+                                          description="Arguments are forwarded to replay_episode.py.")
+    export_parser.set_defaults(handler=command_export, forwards_arguments=True)
+
+    conform_parser = subparsers.add_parser("conform", help="Compare the optimized engine against the reference.",
+                                           description="Arguments are forwarded to models/conformance.py.")
+    conform_parser.set_defaults(handler=command_conform, forwards_arguments=True)
+
+    policy_parser = subparsers.add_parser("policy", help="Serve a trained agent to many simulators, or load test it.",
+                                          description="Arguments are forwarded to machine_learning/policy_server.py.")
+    policy_parser.set_defaults(handler=command_policy, forwards_arguments=True)
+
+    view_parser = subparsers.add_parser("view", help="Watch a trainer started with --spectate.")
+    view_parser.add_argument("--name", default=DEFAULT_BUFFER_NAME, help="Snapshot buffer name used by the trainer.")
+    view_parser.add_argument("--fps", type=int, default=30, help="Frames per second to render at.")
+    view_parser.set_defaults(handler=command_view)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, args.args = parser.parse_known_args(argv)
+    if args.args and not getattr(args, "forwards_arguments", False):
+        parser.error(f"unrecognized arguments: {' '.join(args.args)}")
+    start = time.perf_counter()
+    exit_code = args.handler(args)
+    report_timing(f"{args.command}", start)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,17 @@
+# Physics steps per simulated second: sets headless episode length, lap times, checkpoint cooldowns and replay timing
+FRAME_RATE = 60
+
 # Session parameters
 SESSION_CONFIG = {
     "TRAINING_MODE": True,    # Toggle between training and evaluation modes
     "NUM_EPISODES": 50,       # Number of episodes to run
     "EPISODE_DURATION": 20,   # Duration of each episode in seconds
-    "MANUAL_CONTROL": False   # Enable manual control with arrow keys
+    "MANUAL_CONTROL": False,  # Enable manual control with arrow keys
+    "HEADLESS": False,        # Run without a window, as fast as possible on simulated time
+    "SEED": None,             # Base random seed (None picks a random one per session)
+    "RECORD_EPISODES": True,  # Store each agent episode as seed + action stream for replay
+    "METRICS_SOCKET": None,   # Unix socket path to stream per-episode metrics to (None disables)
+    "SPECTATOR_BUFFER": None  # Shared memory name to publish vehicle snapshots to (None disables)
 }
 
 # Q-learning agent parameters
@@ -13,7 +21,44 @@ QL_CONFIG = {
     "EXPLORATION_RATE": 1.0,  # Epsilon: initial exploration rate
     "EXPLORATION_DECAY": 0.995,  # How fast to decay epsilon over episodes
     "MIN_EXPLORATION_RATE": 0.05,  # Minimum exploration rate (to always explore a little)
-    "Q_TABLE_FILENAME": "v1.pkl"  # Agent 'knowledge' filename
+    "DECISION_INTERVAL": 1,  # Physics steps each chosen action is repeated for (1 = decide every frame)
+    "DISCRETIZER": "FIXED",  # State discretization: "FIXED" buckets or "ADAPTIVE" tree (ignored by "TILE_CODING")
+    "DISCRETIZER_MEMORY_BUDGET": 8_000_000,  # Bytes available to the adaptive tree and its Q-table rows
+    "SPLIT_MIN_VISITS": 200,  # Visits an adaptive cell needs before it may be split
+    "SPLIT_MIN_VARIANCE": 0.5,  # TD error variance an adaptive cell needs before it may be split
+    "Q_TABLE_FILENAME": "v1.pkl",  # Agent 'knowledge' filename
+    "AGENT": "Q_LEARNING",  # "Q_LEARNING", "DYNA_Q", "Q_LAMBDA" or "TILE_CODING"
+    "DYNA_PLANNING_STEPS": 10,  # Dyna-Q: simulated updates per real update
+    "DYNA_PRIORITIZED": False,  # Dyna-Q: prioritized sweeping by TD error instead of uniform sampling
+    "DYNA_PRIORITY_THRESHOLD": 0.01,  # Dyna-Q: minimum |TD error| for a pair to be queued
+    "DYNA_MODEL_SIZE": 100_000,  # Dyna-Q: maximum number of remembered transitions
+    "DYNA_BACKGROUND": False,  # Dyna-Q: plan on a background thread instead of after each update
+    "TRACE_DECAY": 0.8,  # Q(lambda): lambda, how fast eligibility traces fade
+    "TRACE_THRESHOLD": 0.01,  # Q(lambda): traces below this are dropped
+    "TRACE_MAX_LENGTH": 100,  # Q(lambda): maximum number of traced state-action pairs
+    "TILE_NUM_TILINGS": 8,  # Tile coding: number of offset tilings (active features per observation)
+    "TILE_SPEED_WIDTH": 1.5,  # Tile coding: tile width along the speed axis
+    "TILE_SENSOR_WIDTH": 30,  # Tile coding: tile width along each sensor distance axis, in pixels
+    "TILE_MEMORY_SIZE": 2**16  # Tile coding: weight rows (hashed tiles), fixing memory regardless of states seen
+}
+
+# Track progress (laps, lap times and the progress reward)
+PROGRESS_CONFIG = {
+    "ENABLED": True,  # Measure progress along the circuit with a precomputed per-pixel field
+    "REWARD_SCALE": 0.05,  # Reward per pixel of progress (negative when driving backwards; 0 disables)
+    "CACHE_DIRECTORY": "assets/cache"  # Where precomputed progress fields are stored
+}
+
+# Early episode termination (agent episodes only)
+TERMINATION_CONFIG = {
+    "ENABLED": True,  # End episodes that stopped producing useful experience
+    "TRAINING_ONLY": True,  # Let evaluation episodes run their full duration, so their scores stay comparable
+    "STALL_SPEED": 0.5,  # Speed below which the vehicle counts as stalled
+    "STALL_TICKS": 120,  # Consecutive stalled ticks before the episode ends (0 disables)
+    "CHECKPOINT_TICKS": 600,  # Ticks without new progress (or a new checkpoint) before the episode ends (0 disables)
+    "CELL_SIZE": 40,  # Side of the position cells used to detect circling, in pixels
+    "MAX_CELL_TICKS": 240,  # Total ticks allowed in one position cell before the episode ends (0 disables)
+    "PENALTY": 10  # Subtracted from the reward of the step that ends the episode
 }
 
 # Vehicle parameters
@@ -29,6 +74,11 @@ VEHICLE_CONFIG = {
     "COLLISION_TYPE": "CIRCUIT" # "WINDOW" or "CIRCUIT"
 }
 
+# Circuit parameters
+CIRCUIT_CONFIG = {
+    "TRACK_ID": 2  # Loads assets/images/circuit_<TRACK_ID>.png
+}
+
 # General window configuration
 WINDOW_CONFIG = {
     "WIDTH": 850,
@@ -0,0 +1,206 @@
+import os
+import json
+import struct
+import hashlib
+from config import VEHICLE_CONFIG, PROGRESS_CONFIG, TERMINATION_CONFIG, FRAME_RATE
+
+# Fixed-size index entry: seed, track ID, number of steps, data offset, data length, final score, config hash,
+# whether early termination was enabled
+INDEX_ENTRY = struct.Struct("<qHIQIdQ?")
+
+# Actions fit in 2 bits; the remaining bits of each varint hold the run length
+ACTION_BITS = 2
+ACTION_MASK = (1 << ACTION_BITS) - 1
+
+
+def encode_actions(actions):
+    """
+    Encode an action stream as run-length varints.
+
+    Each run is stored as a single unsigned LEB128 varint holding
+    (run_length << 2) | action, so a run of up to 31 repeated actions costs one byte.
+
+    Args:
+        actions (iterable): Action indices in the range 0-3.
+
+    Returns:
+        bytes: The encoded action stream.
+    """
+    recorder = EpisodeRecorder()
+    for action in actions:
+        recorder.record(action)
+    return recorder.to_bytes()
+
+
+def decode_actions(data):
+    """
+    Decode an action stream produced by encode_actions.
+
+    Args:
+        data (bytes): The encoded action stream.
+
+    Returns:
+        list: The action indices, one per physics step.
+    """
+    actions = []
+    value, shift = 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        actions.extend([value & ACTION_MASK] * (value >> ACTION_BITS))
+        value, shift = 0, 0
+    return actions
+
+
+def physics_config_hash():
+    """
+    Hash the settings that decide how an action stream plays out: the frame rate, the vehicle
+    physics and collisions, the progress reward and the termination rules.
+
+    Returns:
+        int: A 64-bit hash, stored with each archived episode.
+    """
+    settings = {
+        "frame_rate": FRAME_RATE,
+        "vehicle": VEHICLE_CONFIG,
+        "progress": {key: value for key, value in PROGRESS_CONFIG.items() if key != "CACHE_DIRECTORY"},
+        "termination": TERMINATION_CONFIG
+    }
+    digest = hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class EpisodeRecorder:
+    def __init__(self):
+        """Initialize an empty recording. Runs are encoded as soon as they end."""
+        self.buffer = bytearray()
+        self.num_steps = 0
+        self._action = None
+        self._run_length = 0
+
+    def record(self, action):
+        """
+        Record the action applied on one physics step.
+
+        Args:
+            action (int): Action index in the range 0-3.
+        """
+        action = int(action)
+        if not 0 <= action <= ACTION_MASK:
+            raise ValueError(f"Action {action} does not fit in {ACTION_BITS} bits.")
+        if action != self._action:
+            self._flush()
+            self._action = action
+        self._run_length += 1
+        self.num_steps += 1
+
+    def _flush(self):
+        """Append the current run to the buffer as a varint."""
+        if self._run_length == 0:
+            return
+        value = (self._run_length << ACTION_BITS) | self._action
+        while value > 0x7F:
+            self.buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+        self._run_length = 0
+
+    def to_bytes(self):
+        """Return the encoded action stream recorded so far."""
+        self._flush()
+        return bytes(self.buffer)
+
+
+class EpisodeArchive:
+    def __init__(self, archive_name="episodes"):
+        """
+        Initialize an indexed episode archive inside the logs directory.
+
+        The archive is made of two files: "<archive_name>.bin" holds the encoded action
+        streams back to back, and "<archive_name>.idx" holds one fixed-size entry per
+        episode so any episode can be located without scanning the data file.
+
+        Args:
+            archive_name (str): Path of the archive relative to the logs directory, without extension.
+        """
+        self.log_directory = "logs"
+        base_path = os.path.join(self.log_directory, archive_name)
+        self.data_path = base_path + ".bin"
+        self.index_path = base_path + ".idx"
+
+        # Ensure the archive directory exists
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+
+    def __len__(self):
+        """Return the number of archived episodes."""
+        try:
+            return os.path.getsize(self.index_path) // INDEX_ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, seed, track_id, recorder, score, termination):
+        """
+        Store a recorded episode at the end of the archive, along with a hash of the current
+        physics configuration so that replays can detect settings that changed since.
+
+        Args:
+            seed (int): Random seed the episode was run with.
+            track_id (int): ID of the circuit the episode was run on.
+            recorder (EpisodeRecorder): The recorded action stream.
+            score (float): Final score of the episode.
+            termination (bool): Whether the early termination rules were applied to the episode.
+
+        Returns:
+            int: The index of the stored episode.
+        """
+        data = recorder.to_bytes()
+        with open(self.data_path, "ab") as data_file:
+            offset = data_file.tell()
+            data_file.write(data)
+        with open(self.index_path, "ab") as index_file:
+            episode_id = index_file.tell() // INDEX_ENTRY.size
+            index_file.write(INDEX_ENTRY.pack(seed, track_id, recorder.num_steps, offset, len(data),
+                                              score, physics_config_hash(), termination))
+        return episode_id
+
+    def read_entry(self, episode_id):
+        """
+        Read the index entry of an episode.
+
+        Args:
+            episode_id (int): Index of the episode. Negative values count from the end.
+
+        Returns:
+            dict: The episode's seed, track_id, num_steps, offset, length, score, config_hash and termination.
+        """
+        num_episodes = len(self)
+        if episode_id < 0:
+            episode_id += num_episodes
+        if not 0 <= episode_id < num_episodes:
+            raise IndexError(f"Episode {episode_id} is not in the archive ({num_episodes} episodes).")
+
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(episode_id * INDEX_ENTRY.size)
+            seed, track_id, num_steps, offset, length, score, config_hash, termination = INDEX_ENTRY.unpack(
+                index_file.read(INDEX_ENTRY.size)
+            )
+        return {"seed": seed, "track_id": track_id, "num_steps": num_steps, "offset": offset, "length": length,
+                "score": score, "config_hash": config_hash, "termination": termination}
+
+    def read(self, episode_id):
+        """
+        Read an archived episode.
+
+        Args:
+            episode_id (int): Index of the episode. Negative values count from the end.
+
+        Returns:
+            dict: The index entry extended with the decoded "actions" list.
+        """
+        episode = self.read_entry(episode_id)
+        with open(self.data_path, "rb") as data_file:
+            data_file.seek(episode["offset"])
+            episode["actions"] = decode_actions(data_file.read(episode["length"]))
+        return episode
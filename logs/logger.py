@@ -1,5 +1,27 @@
 import os
 
+# Agents that do not store their knowledge in the Q-table keep separate logs
+AGENT_LOG_SUFFIXES = {"TILE_CODING": "_tiles"}
+# Q-tables keyed by adaptive tree cells keep separate tables and logs, like QLearningAgent.q_table_path
+DISCRETIZER_LOG_SUFFIXES = {"ADAPTIVE": "_adaptive"}
+
+def get_log_name(q_table_filename, agent, discretizer="FIXED"):
+    """
+    Return the base name shared by the logs and the episode archive of a training setup.
+
+    Args:
+        q_table_filename (str): The configured Q-table filename, e.g. "v1.pkl".
+        agent (str): The configured agent type, e.g. "TILE_CODING".
+        discretizer (str): The configured discretizer, ignored by agents with their own suffix.
+
+    Returns:
+        str: The base name without extension, e.g. "v1", "v1_adaptive" or "v1_tiles".
+    """
+    base_name = os.path.splitext(q_table_filename)[0]
+    if agent in AGENT_LOG_SUFFIXES:
+        return base_name + AGENT_LOG_SUFFIXES[agent]
+    return base_name + DISCRETIZER_LOG_SUFFIXES.get(discretizer, "")
+
 class Logger:
     def __init__(self, log_file="training_log.txt"):
         """
@@ -40,4 +62,16 @@ class Logger:
             score (float): The score to be logged.
         """
         with open(self.log_file, "a") as log_file:
-            log_file.write(f"{score}\n")  # Write the score followed by a newline
\ No newline at end of file
+            log_file.write(f"{score}\n")  # Write the score followed by a newline
+
+    def log_termination(self, episode, step, reason):
+        """
+        Log why an episode ended early.
+
+        Args:
+            episode (int): The episode number.
+            step (int): The physics step at which the episode ended.
+            reason (str): The termination rule that fired.
+        """
+        with open(self.log_file, "a") as log_file:
+            log_file.write(f"{episode} {step} {reason}\n")
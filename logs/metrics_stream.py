@@ -0,0 +1,105 @@
+import os
+import errno
+import socket
+import struct
+import tempfile
+from collections import namedtuple
+
+# Default rendezvous point shared by trainers and the live plotter
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "self_driving_ai_metrics.sock")
+
+# run_id, episode, score, epsilon, steps, q_table_size, steps_per_second
+RECORD = struct.Struct("<IIddIId")
+EpisodeMetrics = namedtuple(
+    "EpisodeMetrics", ["run_id", "episode", "score", "epsilon", "steps", "q_table_size", "steps_per_second"]
+)
+
+
+class MetricsPublisher:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, run_id=None):
+        """
+        Initialize a publisher of per-episode metrics over a Unix datagram socket.
+
+        Publishing never blocks and never fails: if no plotter is listening, or its buffer
+        is full, the record is dropped.
+
+        Args:
+            socket_path (str): Path of the socket the plotter listens on.
+            run_id (int): Identifies this training run. Defaults to the process ID.
+        """
+        self.socket_path = socket_path
+        self.run_id = os.getpid() if run_id is None else run_id
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.dropped = 0  # Records nobody received
+
+    def publish(self, episode, score, epsilon, steps, q_table_size, steps_per_second):
+        """Send the metrics of one episode."""
+        record = RECORD.pack(self.run_id, episode, score, epsilon, steps, q_table_size, steps_per_second)
+        try:
+            self.socket.sendto(record, self.socket_path)
+        except OSError as error:
+            if error.errno not in (errno.ENOENT, errno.ECONNREFUSED, errno.EAGAIN, errno.ENOBUFS):
+                raise
+            self.dropped += 1
+
+    def close(self):
+        """Close the socket."""
+        self.socket.close()
+
+
+class MetricsSubscriber:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        """
+        Listen for metrics published by any number of training runs.
+
+        Args:
+            socket_path (str): Path of the socket to bind. A stale socket file is replaced.
+
+        Raises:
+            FileExistsError: If another subscriber is already listening on the path.
+        """
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            self._remove_stale_socket(socket_path)
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(socket_path)
+        self.socket.setblocking(False)
+
+    @staticmethod
+    def _remove_stale_socket(socket_path):
+        """Remove a socket file left behind by a subscriber that is gone, but never a live one."""
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)  # Nobody is bound to it any more
+            return
+        finally:
+            probe.close()
+        raise FileExistsError(
+            f"Another live plotter is already listening on {socket_path}. Close it first, "
+            f"or listen on another socket (--socket PATH) and publish to it with --metrics-socket PATH."
+        )
+
+    def poll(self):
+        """
+        Return the records received since the last call, without blocking.
+
+        Returns:
+            list: EpisodeMetrics records, oldest first.
+        """
+        records = []
+        while True:
+            try:
+                data = self.socket.recv(RECORD.size)
+            except BlockingIOError:
+                return records
+            if len(data) == RECORD.size:
+                records.append(EpisodeMetrics(*RECORD.unpack(data)))
+
+    def close(self):
+        """Close the socket and remove its file."""
+        self.socket.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,27 @@
+from config import QL_CONFIG
+from machine_learning.q_learning.agent import QLearningAgent
+from machine_learning.q_learning.dyna_agent import DynaQAgent
+from machine_learning.q_learning.q_lambda_agent import QLambdaAgent
+from machine_learning.tile_coding.agent import TileCodingAgent
+
+# Agent types accepted by QL_CONFIG["AGENT"]
+AGENT_CLASSES = {"Q_LEARNING": QLearningAgent, "DYNA_Q": DynaQAgent, "Q_LAMBDA": QLambdaAgent,
+                 "TILE_CODING": TileCodingAgent}
+
+
+def create_agent(state_size, action_size):
+    """
+    Create the agent selected by QL_CONFIG["AGENT"].
+
+    Kept free of pygame, so the command line can inspect the agent before starting a session.
+
+    Args:
+        state_size (int): Number of values in a state.
+        action_size (int): Number of possible actions.
+
+    Returns:
+        QLearningAgent: The agent.
+    """
+    if QL_CONFIG["AGENT"] not in AGENT_CLASSES:
+        raise ValueError(f"Unknown agent: {QL_CONFIG['AGENT']}")
+    return AGENT_CLASSES[QL_CONFIG["AGENT"]](state_size, action_size)
@@ -0,0 +1,424 @@
+import sys
+import os
+import math
+import time
+import struct
+import random
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+
+# Add the parent directory to the path (for config.py, main.py and models)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import QL_CONFIG
+
+DEFAULT_POLICY_SOCKET = os.path.join(tempfile.gettempdir(), "self_driving_ai_policy.sock")
+
+# Request: request ID, number of state values, followed by that many doubles
+REQUEST_HEADER = struct.Struct("<IH")
+# Response: request ID, status, action (only meaningful with STATUS_OK)
+RESPONSE = struct.Struct("<IBI")
+STATUS_OK, STATUS_ERROR = 0, 1
+
+# Latency bucket upper edges, in microseconds
+LATENCY_EDGES_US = [50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000]
+
+
+class Histogram:
+    def __init__(self, edges, unit=""):
+        """
+        Count values into fixed buckets.
+
+        Args:
+            edges (list): Increasing upper edges of the buckets. Larger values go into an overflow bucket.
+            unit (str): Unit printed after the edges.
+        """
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.unit = unit
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+
+    def record(self, values):
+        """Add one value or an array of values."""
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        self.counts += np.bincount(np.searchsorted(self.edges, values), minlength=len(self.counts))
+        self.total += len(values)
+        self.sum += float(values.sum())
+
+    def percentile(self, q):
+        """Return the upper edge of the bucket holding the q-th percentile (inf for the overflow bucket)."""
+        if self.total == 0:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.total))
+        return float(self.edges[bucket]) if bucket < len(self.edges) else float("inf")
+
+    def format(self, title):
+        """Return the histogram as text, one line per non-empty bucket."""
+        mean = self.sum / self.total if self.total else 0.0
+        lines = [f"{title}: {self.total} samples, mean {mean:.1f}{self.unit}, "
+                 f"p50 <= {self.percentile(50):g}{self.unit}, p99 <= {self.percentile(99):g}{self.unit}"]
+        for bucket, count in enumerate(self.counts):
+            if count == 0:
+                continue
+            label = f"<= {self.edges[bucket]:g}" if bucket < len(self.edges) else f"> {self.edges[-1]:g}"
+            share = count / self.total
+            lines.append(f"  {label + self.unit:>12} {count:>9} {share:>6.1%} {'#' * int(round(share * 40))}")
+        return "\n".join(lines)
+
+
+class BatchedPolicy:
+    def __init__(self, agent, max_batch_size=64, max_delay=0.001, use_epsilon=True):
+        """
+        Serve actions from one agent to many concurrent simulators, in micro-batches.
+
+        Requests are queued until max_batch_size of them are waiting or the oldest has waited
+        max_delay seconds, then the whole batch is answered with one vectorized get_actions call.
+        Must be used from a single asyncio event loop.
+
+        Args:
+            agent: Any agent with a get_actions(states, use_epsilon) method.
+            max_batch_size (int): Largest batch evaluated at once.
+            max_delay (float): Longest time a request waits for its batch to fill, in seconds.
+            use_epsilon (bool): Whether to use epsilon-greedy exploration.
+        """
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.use_epsilon = use_epsilon
+        self.pending = []  # (state, future, enqueue time)
+        self.deadline = None  # Timer flushing a partial batch
+
+        self.batch_sizes = Histogram([2 ** i for i in range(int(np.log2(max_batch_size)) + 1)])
+        self.latencies = Histogram(LATENCY_EDGES_US, " us")
+
+    async def get_action(self, state):
+        """
+        Return the action for one state, once its batch has been evaluated.
+
+        Args:
+            state (tuple): The state, as the agent expects it.
+
+        Returns:
+            int: The chosen action index.
+
+        Raises:
+            ValueError: If the state does not have the agent's number of finite values. Invalid
+                        states never join a batch, so they cannot fail other requests.
+        """
+        if len(state) != self.agent.state_size or not all(math.isfinite(value) for value in state):
+            raise ValueError(f"Expected a state of {self.agent.state_size} finite values, got {state!r}")
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((state, future, time.perf_counter()))
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif self.deadline is None:
+            self.deadline = asyncio.get_running_loop().call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        """Evaluate every pending request now."""
+        if self.deadline is not None:
+            self.deadline.cancel()
+            self.deadline = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        try:
+            actions = self.agent.get_actions([state for state, _, _ in batch], self.use_epsilon)
+        except Exception:
+            # Evaluate one by one, so that only the requests that cannot be answered fail
+            actions = []
+            for state, _, _ in batch:
+                try:
+                    actions.append(self.agent.get_actions([state], self.use_epsilon)[0])
+                except Exception as error:
+                    actions.append(error)
+
+        now = time.perf_counter()
+        for (_, future, _), action in zip(batch, actions):
+            if future.done():  # The requester may have been cancelled
+                continue
+            if isinstance(action, Exception):
+                future.set_exception(action)
+            else:
+                future.set_result(int(action))
+        self.batch_sizes.record(len(batch))
+        self.latencies.record([(now - enqueued) * 1e6 for _, _, enqueued in batch])
+
+    def report(self):
+        """Return the batch size and latency histograms as text."""
+        return "\n".join([self.batch_sizes.format("Batch size"), self.latencies.format("Queueing + inference latency")])
+
+
+class PolicyServer:
+    def __init__(self, policy, socket_path=DEFAULT_POLICY_SOCKET):
+        """
+        Expose a BatchedPolicy to other processes over a Unix stream socket.
+
+        Each connection may have any number of requests in flight; responses carry the request
+        ID and can arrive in any order. Requests that cannot be answered (e.g. malformed states)
+        get an error response instead of an action.
+
+        Args:
+            policy (BatchedPolicy): The policy to serve.
+            socket_path (str): Path of the socket to listen on. A stale socket file is replaced.
+        """
+        self.policy = policy
+        self.socket_path = socket_path
+        self.server = None
+        self.connections = 0
+
+    async def start(self):
+        """Start accepting connections."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self._handle_connection, self.socket_path)
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        tasks = set()
+        try:
+            while True:
+                request_id, size = REQUEST_HEADER.unpack(await reader.readexactly(REQUEST_HEADER.size))
+                state = struct.unpack(f"<{size}d", await reader.readexactly(8 * size))
+                task = asyncio.ensure_future(self._respond(writer, request_id, state))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client disconnected
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+            writer.close()
+
+    async def _respond(self, writer, request_id, state):
+        try:
+            response = RESPONSE.pack(request_id, STATUS_OK, await self.policy.get_action(state))
+        except Exception as error:
+            print(f"Policy request {request_id} failed: {error}")
+            response = RESPONSE.pack(request_id, STATUS_ERROR, 0)
+        if not writer.is_closing():
+            writer.write(response)
+
+    async def close(self):
+        """Stop accepting connections and remove the socket file."""
+        self.server.close()
+        await self.server.wait_closed()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class PolicyClient:
+    def __init__(self, socket_path=DEFAULT_POLICY_SOCKET, timeout=5.0):
+        """
+        Request actions from a PolicyServer. Call connect() before get_action().
+
+        Args:
+            socket_path (str): Path of the server's socket.
+            timeout (float): Seconds to wait for each action before giving up.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.reader, self.writer = None, None
+        self.waiting = {}  # Request ID -> future
+        self.next_request_id = 0
+        self.receiver = None
+
+    async def connect(self):
+        """Open the connection to the server."""
+        self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path)
+        self.receiver = asyncio.ensure_future(self._receive())
+
+    async def _receive(self):
+        try:
+            while True:
+                request_id, status, action = RESPONSE.unpack(await self.reader.readexactly(RESPONSE.size))
+                future = self.waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue  # Timed out or cancelled
+                if status == STATUS_OK:
+                    future.set_result(action)
+                else:
+                    future.set_exception(ValueError(f"The policy server could not answer request {request_id}"))
+        except (asyncio.IncompleteReadError, ConnectionError) as error:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Policy server closed the connection: {error}"))
+            self.waiting.clear()
+
+    async def get_action(self, state):
+        """
+        Return the server's action for a state.
+
+        Args:
+            state (tuple): The state, as the served agent expects it.
+
+        Returns:
+            int: The chosen action index.
+
+        Raises:
+            ValueError: If the server could not compute an action for the state.
+            asyncio.TimeoutError: If no answer arrived within the timeout.
+        """
+        request_id = self.next_request_id
+        self.next_request_id = (self.next_request_id + 1) % 2**32
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(REQUEST_HEADER.pack(request_id, len(state)) + struct.pack(f"<{len(state)}d", *state))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self.waiting.pop(request_id, None)
+
+    async def close(self):
+        """Close the connection."""
+        self.receiver.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def load_agent(agent_name, q_table):
+    """Create the configured agent and load its saved table. Exits if there is nothing to serve."""
+    from machine_learning.agents import create_agent
+
+    QL_CONFIG["AGENT"] = agent_name
+    if q_table:
+        QL_CONFIG["Q_TABLE_FILENAME"] = q_table
+    agent = create_agent(6, 4)
+    if not agent.load_q_table():
+        sys.exit(f"No saved agent found at {agent.q_table_path}")
+    return agent
+
+
+async def serve(policy, socket_path, report_interval):
+    """Serve until interrupted, printing the histograms every report_interval seconds."""
+    server = PolicyServer(policy, socket_path)
+    await server.start()
+    print(f"Serving actions on {socket_path} (batches of up to {policy.max_batch_size}, "
+          f"{policy.max_delay * 1000:g} ms deadline)")
+    try:
+        while True:
+            await asyncio.sleep(report_interval)
+            if policy.batch_sizes.total:
+                print(f"{server.connections} connections\n{policy.report()}\n")
+    finally:
+        await server.close()
+
+
+def random_observation(rng, raw):
+    """A plausible observation: speed and five sensor distances, discretized into fixed buckets unless raw."""
+    observation = (rng.uniform(0, 6),) + tuple(rng.uniform(-30, 100) for _ in range(5))
+    if raw:
+        return observation
+    return (int(observation[0]),) + tuple(int(distance / 10) for distance in observation[1:])
+
+
+async def load_test(get_action_factory, workers, requests, raw, seed=0):
+    """
+    Run simulated workers that each request actions one after another, like a simulator stepping.
+
+    Args:
+        get_action_factory: Async callable returning (get_action coroutine function, close coroutine function)
+                            for a new worker.
+        workers (int): Number of concurrent workers.
+        requests (int): Requests per worker.
+        raw (bool): Send raw observations instead of fixed buckets.
+        seed (int): Seed of the generated observations.
+
+    Returns:
+        tuple: (requests per second, client-side round trip Histogram)
+    """
+    round_trips = Histogram(LATENCY_EDGES_US, " us")
+
+    async def worker(index):
+        rng = random.Random(seed * 1_000_003 + index)
+        get_action, close = await get_action_factory()
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                await get_action(random_observation(rng, raw))
+                round_trips.record((time.perf_counter() - start) * 1e6)
+        finally:
+            await close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(workers)))
+    return workers * requests / (time.perf_counter() - start), round_trips
+
+
+def main(argv=None):
+    from machine_learning.agents import AGENT_CLASSES
+
+    parser = argparse.ArgumentParser(description="Serve a trained agent's actions to many simulators in batches.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_policy_arguments(subparser):
+        subparser.add_argument("--agent", default=QL_CONFIG["AGENT"], choices=list(AGENT_CLASSES),
+                               help="Agent type (see QL_CONFIG['AGENT']).")
+        subparser.add_argument("--q-table", help="Q-table filename inside machine_learning/q_learning/q_tables.")
+        subparser.add_argument("--batch-size", type=int, default=64, help="Largest batch evaluated at once.")
+        subparser.add_argument("--max-delay-ms", type=float, default=1.0, help="Longest wait for a batch to fill.")
+        subparser.add_argument("--epsilon", type=float, default=QL_CONFIG["MIN_EXPLORATION_RATE"],
+                               help="Exploration rate of the served policy (0 for greedy).")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve actions on a Unix socket.")
+    add_policy_arguments(serve_parser)
+    serve_parser.add_argument("--socket", default=DEFAULT_POLICY_SOCKET, help="Socket path to listen on.")
+    serve_parser.add_argument("--report-interval", type=float, default=10, help="Seconds between histogram reports.")
+
+    load_parser = subparsers.add_parser("load-test", help="Measure throughput with many simulated workers.")
+    load_parser.add_argument("--workers", type=int, default=200, help="Number of concurrent workers.")
+    load_parser.add_argument("--requests", type=int, default=200, help="Requests per worker.")
+    load_parser.add_argument("--raw", action="store_true", help="Send raw observations (for TILE_CODING).")
+    load_parser.add_argument("--socket", default=DEFAULT_POLICY_SOCKET,
+                             help="Server to test. Ignored with --in-process.")
+    load_parser.add_argument("--in-process", action="store_true",
+                             help="Test a BatchedPolicy in this process instead of a running server.")
+    add_policy_arguments(load_parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        agent = load_agent(args.agent, args.q_table)
+        agent.exploration_rate = args.epsilon
+        policy = BatchedPolicy(agent, args.batch_size, args.max_delay_ms / 1000, use_epsilon=args.epsilon > 0)
+        try:
+            asyncio.run(serve(policy, args.socket, args.report_interval))
+        except KeyboardInterrupt:
+            print(f"\n{policy.report()}")
+        return
+
+    if args.in_process:
+        agent = load_agent(args.agent, args.q_table)
+        agent.exploration_rate = args.epsilon
+        policy = BatchedPolicy(agent, args.batch_size, args.max_delay_ms / 1000, use_epsilon=args.epsilon > 0)
+
+        async def connect():
+            async def close():
+                pass
+            return policy.get_action, close
+    else:
+        policy = None
+
+        async def connect():
+            client = PolicyClient(args.socket)
+            await client.connect()
+            return client.get_action, client.close
+
+    try:
+        throughput, round_trips = asyncio.run(load_test(connect, args.workers, args.requests, args.raw))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No policy server is listening on {args.socket}. Start one with: cli.py policy serve")
+    print(f"{args.workers} workers x {args.requests} requests: {throughput:,.0f} actions/s")
+    print(round_trips.format("Round trip latency"))
+    if policy is not None:
+        print(policy.report())
+
+
+if __name__ == "__main__":
+    main()
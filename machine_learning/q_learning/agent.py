@@ -9,13 +9,44 @@ from config import QL_CONFIG
 # Add the grandparent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+def explore(actions, exploration_rate, action_size):
+    """
+    Replace each greedy action by a random one with probability exploration_rate, in place.
+
+    The draws are seeded from the random module, like get_action, so seeding it makes batched
+    and single-state action selection reproducible alike.
+
+    Args:
+        actions (np.ndarray): Greedy action indices.
+        exploration_rate (float): Epsilon.
+        action_size (int): Number of possible actions.
+
+    Returns:
+        np.ndarray: The actions.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    exploring = rng.random(len(actions)) < exploration_rate
+    actions[exploring] = rng.integers(action_size, size=int(exploring.sum()))
+    return actions
+
+def get_visits_path(q_table_path):
+    """Return the path of the visit counts stored next to a Q-table file."""
+    return q_table_path.replace(".pkl", "_visits.pkl")
+
 class QLearningAgent:
+    continuous_states = False  # Learns from discretized states
+
     def __init__(self, state_size, action_size):
         """Initialize the Q-learning agent with state and action sizes, and load the Q-learning parameters from config."""
         self.state_size = state_size  # The number of possible states
         self.action_size = action_size  # The number of possible actions
         self.q_table = defaultdict(self._default_q_values)  # Initialize Q-table with default values for unseen states
+        self.visit_counts = defaultdict(int)  # Number of Q-value updates made in each state
         self.q_table_path = os.path.join("machine_learning", "q_learning", "q_tables", QL_CONFIG["Q_TABLE_FILENAME"])
+        if QL_CONFIG["DISCRETIZER"] == "ADAPTIVE":
+            # Tree cell keys must never mix with fixed bucket keys in one table
+            self.q_table_path = self.q_table_path.replace(".pkl", "_adaptive.pkl")
+        self.visits_path = get_visits_path(self.q_table_path)
         self.learning_rate = QL_CONFIG["LEARNING_RATE"]  # Alpha
         self.discount_factor = QL_CONFIG["DISCOUNT_FACTOR"]  # Gamma
         self.exploration_rate = QL_CONFIG["EXPLORATION_RATE"]  # Epsilon
@@ -47,27 +78,93 @@ class QLearningAgent:
         else:
             return np.argmax(self.q_table[state])
 
-    def update_q_value(self, state, action, reward, next_state):
-        """Update the Q-value for a state-action pair using the Q-learning formula."""
+    def get_actions(self, states, use_epsilon=True):
+        """
+        Get an action for each of many states at once, using epsilon-greedy strategy.
+
+        Unlike get_action, unseen states are not added to the Q-table.
+
+        Args:
+            states (list): State tuples.
+            use_epsilon (bool): Whether to use epsilon-greedy exploration.
+
+        Returns:
+            np.ndarray: The chosen action index for each state.
+        """
+        unseen = self._default_q_values()
+        q_values = np.array([self.q_table.get(state, unseen) for state in states]).reshape(len(states), self.action_size)
+        actions = np.argmax(q_values, axis=1)
+        if use_epsilon:
+            explore(actions, self.exploration_rate, self.action_size)
+        return actions
+
+    def update_q_value(self, state, action, reward, next_state, steps=1):
+        """
+        Update the Q-value for a state-action pair using the Q-learning formula.
+
+        Args:
+            state: The state in which the action was chosen.
+            action (int): The chosen action index.
+            reward (float): The (discounted) reward collected while the action was applied.
+            next_state: The state reached afterwards.
+            steps (int): Number of physics steps the action was repeated for. The bootstrapped
+                         value of next_state is discounted by gamma ** steps.
+
+        Returns:
+            float: The TD error of the update.
+        """
         best_next_action = np.argmax(self.q_table[next_state])
-        td_target = reward + self.discount_factor * self.q_table[next_state][best_next_action]
+        td_target = reward + self.discount_factor ** steps * self.q_table[next_state][best_next_action]
         td_error = td_target - self.q_table[state][action]
         self.q_table[state][action] += self.learning_rate * td_error
+        self.visit_counts[state] += 1
+        return td_error
+
+    def reset_episode(self, seed=None):
+        """
+        Prepare for a new episode. One-step Q-learning keeps no per-episode state.
+
+        Args:
+            seed (int): Seed of the episode, for agents with their own random state.
+        """
 
     def decay_exploration(self):
         """Gradually decay the exploration rate (epsilon)."""
         self.exploration_rate = max(self.min_exploration_rate, self.exploration_rate * self.exploration_decay)
 
+    def table_size(self):
+        """Number of states in the Q-table."""
+        return len(self.q_table)
+
     def load_q_table(self):
-        """Load the Q-table from a file. Returns True if successful, False if the file does not exist."""
+        """
+        Load the Q-table (and its visit counts, if present) from a file.
+        Returns True if successful, False if the file does not exist.
+
+        Any mapping of states to Q-value arrays is accepted, including tables compacted with
+        q_table_tool.py, whose rows may be stored as float16 or float32. Rows are upcast to
+        float64, so that continued training does not lose small updates to rounding.
+        """
         try:
             with open(self.q_table_path, "rb") as f:
-                self.q_table = pickle.load(f)
-                return True
+                stored = pickle.load(f)
+            self.q_table = defaultdict(self._default_q_values, {
+                state: np.asarray(q_values, dtype=np.float64) for state, q_values in stored.items()
+            })
         except FileNotFoundError:
             return False
 
+        try:
+            with open(self.visits_path, "rb") as f:
+                self.visit_counts = defaultdict(int, pickle.load(f))
+        except FileNotFoundError:
+            self.visit_counts = defaultdict(int)
+        return True
+
     def save_q_table(self):
-        """Guarda la Q-table en un archivo."""
+        """Save the Q-table and its visit counts to files."""
+        # Plain dicts, so the pickles do not reference the agent through the default factory
         with open(self.q_table_path, "wb") as f:
-            pickle.dump(self.q_table, f)
\ No newline at end of file
+            pickle.dump(dict(self.q_table), f)
+        with open(self.visits_path, "wb") as f:
+            pickle.dump(dict(self.visit_counts), f)
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import random
+import argparse
+import numpy as np
+
+# Add the grandparent directory to the path (for config.py, main.py and models)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import SESSION_CONFIG, QL_CONFIG
+
+
+def train(agent_name, seed, num_episodes, environment):
+    """
+    Train a fresh agent headless and return its score and lap times per episode.
+
+    Args:
+        agent_name (str): Agent type, as accepted by QL_CONFIG["AGENT"].
+        seed (int): Seed of the run. Episode i is seeded with seed * 1_000_003 + i.
+        num_episodes (int): Number of episodes to train for.
+        environment (Environment): A headless environment.
+
+    Returns:
+        tuple: (score of each episode, lap times of all completed laps in simulated seconds)
+    """
+    from main import create_discretizer, run_episode
+    from machine_learning.agents import create_agent
+    from models.vehicle import Vehicle
+    from models.termination import TerminationMonitor
+
+    QL_CONFIG["AGENT"] = agent_name
+    agent = create_agent(6, 4)
+    vehicle = Vehicle(environment)
+    discretizer = create_discretizer(vehicle, agent)
+    if discretizer is not None:
+        vehicle.discretizer = discretizer
+    termination = TerminationMonitor(environment) if TerminationMonitor.is_enabled(training=True) else None
+
+    scores, lap_times = [], []
+    for episode in range(num_episodes):
+        episode_seed = seed * 1_000_003 + episode
+        random.seed(episode_seed)
+        vehicle.reset()
+        agent.reset_episode(episode_seed)
+        score, _, _ = run_episode(environment, vehicle, agent, manual_control=False, termination=termination)
+        scores.append(score)
+        lap_times.extend(vehicle.lap_times)
+    return scores, lap_times
+
+
+def episodes_to_target(scores, target_score, window):
+    """
+    Return the first episode (1-based) at which the moving average score reaches the target,
+    or None if it never does.
+    """
+    for end in range(window, len(scores) + 1):
+        if np.mean(scores[end - window:end]) >= target_score:
+            return end
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare how fast agents reach a target score (headless).")
+    parser.add_argument("--agents", nargs="+", default=["Q_LEARNING", "Q_LAMBDA"], help="Agent types to compare.")
+    parser.add_argument("--episodes", type=int, default=200, help="Training episodes per run.")
+    parser.add_argument("--seeds", type=int, default=3, help="Number of independent runs per agent.")
+    parser.add_argument("--target-score", type=float, default=50, help="Moving average score to reach.")
+    parser.add_argument("--window", type=int, default=10, help="Moving average window, in episodes.")
+    parser.add_argument("--duration", type=float, default=SESSION_CONFIG["EPISODE_DURATION"],
+                        help="Simulated episode duration in seconds.")
+    args = parser.parse_args(argv)
+
+    from models.environment import Environment
+
+    SESSION_CONFIG["TRAINING_MODE"] = True
+    SESSION_CONFIG["EPISODE_DURATION"] = args.duration
+    environment = Environment(headless=True)
+
+    print(f"{'agent':>12} {'seed':>5} {'to target':>10} {'last avg':>9} {'best':>8} {'laps':>5} {'best lap':>9} {'time (s)':>9}")
+    results = {}
+    for agent_name in args.agents:
+        results[agent_name] = []
+        for seed in range(args.seeds):
+            start = time.perf_counter()
+            scores, lap_times = train(agent_name, seed, args.episodes, environment)
+            elapsed = time.perf_counter() - start
+
+            reached = episodes_to_target(scores, args.target_score, args.window)
+            results[agent_name].append(reached)
+            print(f"{agent_name:>12} {seed:>5} {str(reached or '-'):>10} "
+                  f"{np.mean(scores[-args.window:]):>9.1f} {max(scores):>8.1f} {len(lap_times):>5} "
+                  f"{(f'{min(lap_times):.2f}' if lap_times else '-'):>9} {elapsed:>9.1f}")
+
+    print(f"\nEpisodes to reach a {args.window}-episode average of {args.target_score}:")
+    for agent_name, reached in results.items():
+        successes = [episodes for episodes in reached if episodes is not None]
+        median = f"{np.median(successes):.0f}" if successes else "-"
+        print(f"{agent_name:>12}: median {median} ({len(successes)}/{len(reached)} runs reached the target)")
+
+
+if __name__ == "__main__":
+    main()
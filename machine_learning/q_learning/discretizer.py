@@ -0,0 +1,237 @@
+import sys
+import numpy as np
+
+
+class FixedDiscretizer:
+    """Discretize observations into fixed-size buckets: whole speed units and 10 px sensor bands."""
+
+    def discretize(self, observation):
+        """
+        Map an observation to a state tuple.
+
+        Args:
+            observation (tuple): (speed, sensor distances...).
+
+        Returns:
+            tuple: The discretized state.
+        """
+        return (int(observation[0]),) + tuple(int(distance / 10) for distance in observation[1:])
+
+    def observe(self, state, value):
+        """Fixed buckets never change, so observations are ignored."""
+
+    def stats(self):
+        """Return an empty dict: fixed buckets have no bookkeeping to report."""
+        return {}
+
+
+class RawDiscretizer:
+    """Pass observations through unchanged, for agents that generalize over continuous inputs."""
+
+    def discretize(self, observation):
+        """
+        Return the observation as a state tuple.
+
+        Args:
+            observation (tuple): (speed, sensor distances...).
+
+        Returns:
+            tuple: The raw observation.
+        """
+        return tuple(observation)
+
+    def observe(self, state, value):
+        """Raw observations need no refinement, so observations are ignored."""
+
+    def stats(self):
+        """Return an empty dict: raw observations have no bookkeeping to report."""
+        return {}
+
+
+class AdaptiveDiscretizer:
+    """
+    Discretize observations with a k-d tree that only refines cells that need it.
+
+    Every leaf of the tree is a box in observation space and a state of the Q-table, keyed by
+    the lower corner of the box. A leaf is split in half when it has been visited often enough
+    and the TD errors observed in it vary enough to suggest it merges states with different
+    values. The tree is stored in preallocated arrays whose size is derived from the memory
+    budget, so the number of states can never exceed what the budget allows.
+    """
+
+    def __init__(self, low, high, min_widths, action_size, memory_budget,
+                 split_min_visits=100, split_min_variance=0.01, on_split=None):
+        """
+        Initialize the tree with a single leaf covering the whole observation space.
+
+        Args:
+            low (sequence): Lower bound of each observation dimension.
+            high (sequence): Upper bound of each observation dimension.
+            min_widths (sequence): Smallest cell width allowed in each dimension.
+            action_size (int): Number of actions, used to estimate the Q-table row size.
+            memory_budget (int): Bytes available for the tree and its Q-table rows.
+            split_min_visits (int): Visits a leaf needs before it may be split.
+            split_min_variance (float): TD error variance a leaf needs before it may be split.
+            on_split (callable): Called with (parent_state, left_state, right_state) after a split.
+                                 The left child keeps the parent's key.
+        """
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.min_widths = np.asarray(min_widths, dtype=np.float64)
+        self.dims = len(self.low)
+        self.memory_budget = memory_budget
+        self.split_min_visits = split_min_visits
+        self.split_min_variance = split_min_variance
+        self.on_split = on_split
+
+        # Estimated size of one Q-table entry: key tuple of floats, value array and dict slot
+        self.q_row_bytes = (sys.getsizeof(np.zeros(action_size)) + sys.getsizeof(tuple(self.low))
+                            + self.dims * sys.getsizeof(0.0) + 3 * 8)
+        # Bytes per tree node: split_dim, split_value, left, right, lower, upper, visits, mean, m2
+        self.node_bytes = 1 + 8 + 4 + 4 + 2 * 8 * self.dims + 8 + 8 + 8
+
+        # Each leaf costs one Q-table row plus (almost) two tree nodes
+        self.max_leaves = max(1, int(memory_budget // (self.q_row_bytes + 2 * self.node_bytes)))
+        max_nodes = 2 * self.max_leaves - 1
+
+        self.split_dim = np.full(max_nodes, -1, dtype=np.int8)  # -1 marks a leaf
+        self.split_value = np.zeros(max_nodes, dtype=np.float64)
+        self.left = np.zeros(max_nodes, dtype=np.int32)
+        self.right = np.zeros(max_nodes, dtype=np.int32)
+        self.lower = np.zeros((max_nodes, self.dims), dtype=np.float64)
+        self.upper = np.zeros((max_nodes, self.dims), dtype=np.float64)
+        self.visits = np.zeros(max_nodes, dtype=np.int64)
+        self.mean = np.zeros(max_nodes, dtype=np.float64)  # Running mean of observed TD errors
+        self.m2 = np.zeros(max_nodes, dtype=np.float64)  # Running sum of squared deviations
+
+        self.lower[0], self.upper[0] = self.low, self.high
+        self.num_nodes = 1
+        self.leaf_index = {self._key(0): 0}  # State key -> leaf node
+
+    def _key(self, node):
+        """Return the state key of a leaf: the lower corner of its box."""
+        return tuple(float(value) for value in self.lower[node])
+
+    @property
+    def num_leaves(self):
+        """Number of leaves, i.e. distinct states."""
+        return (self.num_nodes + 1) // 2
+
+    def discretize(self, observation):
+        """
+        Map an observation to the key of the leaf containing it.
+
+        Args:
+            observation (tuple): (speed, sensor distances...).
+
+        Returns:
+            tuple: The state key.
+        """
+        node = 0
+        while self.split_dim[node] >= 0:
+            if observation[self.split_dim[node]] < self.split_value[node]:
+                node = self.left[node]
+            else:
+                node = self.right[node]
+        return self._key(node)
+
+    def observe(self, state, value):
+        """
+        Record a TD error observed in a state and split its leaf if that is justified.
+
+        Args:
+            state (tuple): A key returned by discretize.
+            value (float): The TD error of the update made in that state.
+        """
+        node = self.leaf_index.get(state)
+        if node is None:
+            return
+
+        # Welford's online variance
+        self.visits[node] += 1
+        delta = value - self.mean[node]
+        self.mean[node] += delta / self.visits[node]
+        self.m2[node] += delta * (value - self.mean[node])
+
+        visits = self.visits[node]
+        if visits >= self.split_min_visits and self.m2[node] / (visits - 1) >= self.split_min_variance:
+            self._split(node)
+
+    def _split(self, node):
+        """Split a leaf in half along its widest dimension, relative to the minimum widths."""
+        if self.num_leaves >= self.max_leaves:
+            return
+
+        widths = (self.upper[node] - self.lower[node]) / self.min_widths
+        dim = int(np.argmax(widths))
+        if widths[dim] < 2:
+            return  # Already at the finest allowed resolution
+
+        parent_key = self._key(node)
+        middle = (self.lower[node, dim] + self.upper[node, dim]) / 2
+        left, right = self.num_nodes, self.num_nodes + 1
+        self.num_nodes += 2
+
+        for child in (left, right):
+            self.lower[child], self.upper[child] = self.lower[node], self.upper[node]
+        self.upper[left, dim] = middle
+        self.lower[right, dim] = middle
+
+        self.split_dim[node] = dim
+        self.split_value[node] = middle
+        self.left[node], self.right[node] = left, right
+
+        del self.leaf_index[parent_key]
+        left_key, right_key = self._key(left), self._key(right)
+        self.leaf_index[left_key] = left
+        self.leaf_index[right_key] = right
+
+        if self.on_split is not None:
+            self.on_split(parent_key, left_key, right_key)
+
+    def stats(self):
+        """
+        Return statistics about the tree.
+
+        Returns:
+            dict: Number of states, maximum states allowed by the budget, visits per state
+                  (min, mean, max) and estimated bytes used.
+        """
+        leaves = np.fromiter(self.leaf_index.values(), dtype=np.int64)
+        visits = self.visits[leaves]
+        return {
+            "states": self.num_leaves,
+            "max_states": self.max_leaves,
+            "visits_min": int(visits.min()),
+            "visits_mean": float(visits.mean()),
+            "visits_max": int(visits.max()),
+            "bytes_used": self.num_nodes * self.node_bytes + self.num_leaves * self.q_row_bytes,
+            "memory_budget": self.memory_budget
+        }
+
+    def save(self, path):
+        """Save the tree to a .npz file."""
+        n = self.num_nodes
+        np.savez(path, split_dim=self.split_dim[:n], split_value=self.split_value[:n], left=self.left[:n],
+                 right=self.right[:n], lower=self.lower[:n], upper=self.upper[:n], visits=self.visits[:n],
+                 mean=self.mean[:n], m2=self.m2[:n])
+
+    def load(self, path):
+        """
+        Load a tree saved with save(). Returns True if successful, False if the file does not exist.
+        Trees larger than the current memory budget are rejected with a ValueError.
+        """
+        try:
+            data = np.load(path)
+        except FileNotFoundError:
+            return False
+
+        n = len(data["split_dim"])
+        if n > len(self.split_dim):
+            raise ValueError(f"Saved tree has {n} nodes, but the memory budget allows {len(self.split_dim)}.")
+
+        for name in ("split_dim", "split_value", "left", "right", "lower", "upper", "visits", "mean", "m2"):
+            getattr(self, name)[:n] = data[name]
+        self.num_nodes = n
+        self.leaf_index = {self._key(node): node for node in range(n) if self.split_dim[node] < 0}
+        return True
@@ -0,0 +1,162 @@
+import heapq
+import random
+import threading
+from collections import defaultdict
+import numpy as np
+from config import QL_CONFIG
+from machine_learning.q_learning.agent import QLearningAgent
+
+class DynaQAgent(QLearningAgent):
+    def __init__(self, state_size, action_size):
+        """
+        Initialize a Dyna-Q agent: a Q-learning agent that also learns a transition model and
+        replays simulated transitions from it between real environment steps.
+        """
+        super().__init__(state_size, action_size)
+        self.planning_steps = QL_CONFIG["DYNA_PLANNING_STEPS"]  # Simulated updates per real update
+        self.prioritized = QL_CONFIG["DYNA_PRIORITIZED"]  # Prioritized sweeping instead of uniform sampling
+        self.priority_threshold = QL_CONFIG["DYNA_PRIORITY_THRESHOLD"]  # Minimum |TD error| to queue a pair
+        self.model_size = QL_CONFIG["DYNA_MODEL_SIZE"]  # Maximum number of remembered transitions
+
+        self.model = {}  # (state, action) -> (reward, next_state, steps), the latest observed outcome
+        self.model_keys = []  # Keys of the model, for uniform sampling
+        self.model_slots = {}  # (state, action) -> index in model_keys
+        self.predecessors = defaultdict(set)  # next_state -> {(state, action)} leading to it
+        self.queue = []  # Max-heap of (-priority, counter, (state, action)) for prioritized sweeping
+        self.queue_counter = 0
+        self.planning_updates = 0
+
+        self.rng = random.Random()  # Separate from the global RNG so planning does not shift exploration
+        self.lock = threading.RLock()
+        self.planning_thread = None
+        self.stop_planning = threading.Event()
+
+    def reset_episode(self, seed=None):
+        """
+        Seed the planning RNG from the episode seed, so that sampled transitions and model
+        evictions are reproducible like the rest of the episode.
+
+        Args:
+            seed (int): Seed of the episode. None keeps the current random state.
+        """
+        if seed is not None:
+            with self.lock:
+                self.rng.seed(seed)
+
+    def update_q_value(self, state, action, reward, next_state, steps=1):
+        """
+        Update the Q-value from a real transition, store it in the model and, unless a background
+        planning thread is running, run the configured number of planning updates.
+
+        Returns:
+            float: The TD error of the real update.
+        """
+        with self.lock:
+            td_error = super().update_q_value(state, action, reward, next_state, steps)
+            self._remember(state, action, reward, next_state, steps)
+            if self.prioritized:
+                self._push(state, action, abs(td_error))
+
+        if self.planning_thread is None:
+            self.plan(self.planning_steps)
+        return td_error
+
+    def _remember(self, state, action, reward, next_state, steps):
+        """Store a transition in the model, evicting a random one when the model is full."""
+        key = (state, action)
+        if key in self.model:
+            self._forget_predecessor(key)
+        elif len(self.model_keys) < self.model_size:
+            self.model_slots[key] = len(self.model_keys)
+            self.model_keys.append(key)
+        else:
+            slot = self.rng.randrange(len(self.model_keys))
+            evicted = self.model_keys[slot]
+            self._forget_predecessor(evicted)
+            del self.model[evicted]
+            del self.model_slots[evicted]
+            self.model_keys[slot] = key
+            self.model_slots[key] = slot
+
+        self.model[key] = (reward, next_state, steps)
+        self.predecessors[next_state].add(key)
+
+    def _forget_predecessor(self, key):
+        """Remove a modelled pair from the predecessors of the state it currently leads to."""
+        next_state = self.model[key][1]
+        self.predecessors[next_state].discard(key)
+        if not self.predecessors[next_state]:
+            del self.predecessors[next_state]
+
+    def _push(self, state, action, priority):
+        """Queue a state-action pair for prioritized sweeping if its priority is high enough."""
+        if priority > self.priority_threshold and len(self.queue) < self.model_size:
+            self.queue_counter += 1
+            heapq.heappush(self.queue, (-priority, self.queue_counter, (state, action)))
+
+    def _td_error(self, state, action):
+        """TD error of a state-action pair according to the model."""
+        reward, next_state, steps = self.model[(state, action)]
+        td_target = reward + self.discount_factor ** steps * np.max(self.q_table[next_state])
+        return td_target - self.q_table[state][action]
+
+    def plan(self, num_updates):
+        """
+        Run simulated Q-value updates using transitions from the model.
+
+        Args:
+            num_updates (int): Maximum number of planning updates.
+
+        Returns:
+            int: Number of updates actually made (fewer if the model or queue ran empty).
+        """
+        made = 0
+        for _ in range(num_updates):
+            with self.lock:
+                if self.prioritized:
+                    if not self.queue:
+                        break
+                    _, _, key = heapq.heappop(self.queue)
+                    if key not in self.model:
+                        continue
+                else:
+                    if not self.model_keys:
+                        break
+                    key = self.model_keys[self.rng.randrange(len(self.model_keys))]
+
+                state, action = key
+                self.q_table[state][action] += self.learning_rate * self._td_error(state, action)
+
+                if self.prioritized:
+                    # Propagate the change backwards to the pairs that lead into this state
+                    for predecessor in self.predecessors.get(state, ()):
+                        self._push(*predecessor, abs(self._td_error(*predecessor)))
+
+                made += 1
+                self.planning_updates += 1
+        return made
+
+    def _planning_loop(self):
+        """Plan continuously until stopped, idling briefly while there is nothing to plan."""
+        while not self.stop_planning.is_set():
+            if self.plan(self.planning_steps or 1) == 0:
+                self.stop_planning.wait(0.001)
+
+    def start_background_planning(self):
+        """Run planning updates on a background thread instead of after every real update."""
+        if self.planning_thread is None:
+            self.stop_planning.clear()
+            self.planning_thread = threading.Thread(target=self._planning_loop, daemon=True)
+            self.planning_thread.start()
+
+    def stop_background_planning(self):
+        """Stop the background planning thread, if running."""
+        if self.planning_thread is not None:
+            self.stop_planning.set()
+            self.planning_thread.join()
+            self.planning_thread = None
+
+    def save_q_table(self):
+        """Save the Q-table while holding the lock, so a planning thread cannot resize it mid-save."""
+        with self.lock:
+            super().save_q_table()
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+import numpy as np
+from config import QL_CONFIG
+from machine_learning.q_learning.agent import QLearningAgent
+
+class QLambdaAgent(QLearningAgent):
+    def __init__(self, state_size, action_size):
+        """
+        Initialize a Watkins Q(lambda) agent: Q-learning with eligibility traces, so each TD error
+        also updates the state-action pairs visited shortly before.
+
+        Traces are kept sparse in an ordered dict of recently visited pairs. Pairs whose trace
+        decays below TRACE_THRESHOLD are dropped, and at most TRACE_MAX_LENGTH pairs are kept,
+        so the cost of an update stays bounded.
+        """
+        super().__init__(state_size, action_size)
+        self.trace_decay = QL_CONFIG["TRACE_DECAY"]  # Lambda
+        self.trace_threshold = QL_CONFIG["TRACE_THRESHOLD"]  # Traces below this are dropped
+        self.trace_max_length = QL_CONFIG["TRACE_MAX_LENGTH"]  # Maximum number of traced pairs
+        self.traces = OrderedDict()  # (state, action) -> eligibility, oldest first
+
+    def reset_episode(self, seed=None):
+        """Clear the eligibility traces: they must not carry over between episodes."""
+        self.traces.clear()
+
+    def update_q_value(self, state, action, reward, next_state, steps=1):
+        """
+        Update the Q-values of all traced state-action pairs with the TD error of this transition.
+
+        Args:
+            state: The state in which the action was chosen.
+            action (int): The chosen action index.
+            reward (float): The (discounted) reward collected while the action was applied.
+            next_state: The state reached afterwards.
+            steps (int): Number of physics steps the action was repeated for.
+
+        Returns:
+            float: The TD error of the update.
+        """
+        q_values = self.q_table[state]
+
+        # Watkins: traces only follow the greedy policy, so an exploratory action cuts them
+        if q_values[action] != np.max(q_values):
+            self.traces.clear()
+
+        td_target = reward + self.discount_factor ** steps * np.max(self.q_table[next_state])
+        td_error = td_target - q_values[action]
+
+        # Replacing trace for the current pair, moved to the most recent end
+        key = (state, action)
+        self.traces.pop(key, None)
+        self.traces[key] = 1.0
+        if len(self.traces) > self.trace_max_length:
+            self.traces.popitem(last=False)
+
+        step_size = self.learning_rate * td_error
+        decay = (self.discount_factor * self.trace_decay) ** steps
+        expired = []
+        for (traced_state, traced_action), trace in self.traces.items():
+            self.q_table[traced_state][traced_action] += step_size * trace
+            trace *= decay
+            if trace < self.trace_threshold:
+                expired.append((traced_state, traced_action))
+            else:
+                self.traces[(traced_state, traced_action)] = trace
+        for expired_key in expired:
+            del self.traces[expired_key]
+
+        self.visit_counts[state] += 1
+        return td_error
@@ -0,0 +1,195 @@
+import sys
+import os
+import pickle
+import argparse
+import numpy as np
+
+# Add the grandparent directory to the path (older Q-tables reference the agent module when unpickled)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from machine_learning.q_learning.agent import get_visits_path
+
+ACTION_NAMES = ["accelerate", "left", "right", "decelerate"]
+DTYPES = {"float16": np.float16, "float32": np.float32, "float64": np.float64}
+
+
+def load_table(path):
+    """
+    Load a Q-table and its visit counts.
+
+    Args:
+        path (str): Path of the Q-table pickle.
+
+    Returns:
+        tuple: (q_table, visit_counts) as plain dicts. visit_counts is None if no visits file exists.
+    """
+    with open(path, "rb") as f:
+        q_table = dict(pickle.load(f))
+    try:
+        with open(get_visits_path(path), "rb") as f:
+            visit_counts = dict(pickle.load(f))
+    except FileNotFoundError:
+        visit_counts = None
+    return q_table, visit_counts
+
+
+def save_table(path, q_table, visit_counts):
+    """Save a Q-table (and its visit counts, if known) in the format read by QLearningAgent.load_q_table."""
+    with open(path, "wb") as f:
+        pickle.dump(q_table, f)
+    if visit_counts is not None:
+        with open(get_visits_path(path), "wb") as f:
+            pickle.dump(visit_counts, f)
+
+
+def estimate_memory(q_table):
+    """
+    Estimate the in-memory size of a Q-table in bytes: the dict, its keys and its value arrays.
+
+    Args:
+        q_table (dict): Mapping of state tuples to Q-value arrays.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    total = sys.getsizeof(q_table)
+    for state, values in q_table.items():
+        total += sys.getsizeof(state) + sum(sys.getsizeof(value) for value in state)
+        total += sys.getsizeof(values)
+    return total
+
+
+def analyze(q_table, visit_counts=None, top=10):
+    """
+    Compute statistics about a Q-table.
+
+    Args:
+        q_table (dict): Mapping of state tuples to Q-value arrays.
+        visit_counts (dict): Optional mapping of states to the number of updates made in them.
+        top (int): Number of most visited states to report.
+
+    Returns:
+        dict: Number of states, all-zero rows, per-action percentiles, dtypes, memory footprint
+              and the most visited states.
+    """
+    states = list(q_table)
+    if states:
+        values = np.array([np.asarray(q_table[state], dtype=np.float64) for state in states])
+    else:
+        values = np.zeros((0, 0))
+    zero_rows = int(np.count_nonzero(~values.any(axis=1)))
+
+    per_action = []
+    for action in range(values.shape[1]):
+        column = values[:, action]
+        name = ACTION_NAMES[action] if action < len(ACTION_NAMES) else str(action)
+        per_action.append({
+            "action": name,
+            "min": float(column.min()),
+            "p25": float(np.percentile(column, 25)),
+            "median": float(np.median(column)),
+            "p75": float(np.percentile(column, 75)),
+            "max": float(column.max()),
+            "mean": float(column.mean()),
+            "nonzero": int(np.count_nonzero(column))
+        })
+
+    most_visited = []
+    if visit_counts:
+        ranked = sorted(visit_counts.items(), key=lambda item: item[1], reverse=True)[:top]
+        most_visited = [(state, count, q_table.get(state)) for state, count in ranked]
+
+    return {
+        "states": len(states),
+        "zero_rows": zero_rows,
+        "dtypes": sorted({str(np.asarray(row).dtype) for row in q_table.values()}),
+        "memory_bytes": estimate_memory(q_table),
+        "per_action": per_action,
+        "most_visited": most_visited
+    }
+
+
+def compact(q_table, visit_counts=None, dtype=np.float32, drop_zero_rows=True, min_visits=0):
+    """
+    Compact a Q-table.
+
+    Args:
+        q_table (dict): Mapping of state tuples to Q-value arrays.
+        visit_counts (dict): Optional mapping of states to the number of updates made in them.
+        dtype: NumPy dtype the rows are stored as.
+        drop_zero_rows (bool): Drop rows that were never updated (all zeros).
+        min_visits (int): Drop states updated fewer times than this. Requires visit_counts.
+
+    Returns:
+        tuple: (q_table, visit_counts) with the remaining states.
+    """
+    if min_visits > 0 and visit_counts is None:
+        raise ValueError("Pruning by visit count requires the Q-table's visits file.")
+
+    compacted = {}
+    for state, values in q_table.items():
+        values = np.asarray(values)
+        if drop_zero_rows and not values.any():
+            continue
+        if min_visits > 0 and visit_counts.get(state, 0) < min_visits:
+            continue
+        compacted[state] = values.astype(dtype)
+
+    if visit_counts is not None:
+        visit_counts = {state: count for state, count in visit_counts.items() if state in compacted}
+    return compacted, visit_counts
+
+
+def print_report(path, stats):
+    """Print the statistics returned by analyze()."""
+    print(f"Q-table: {path} ({os.path.getsize(path)} bytes on disk)")
+    print(f"States: {stats['states']}  All-zero rows: {stats['zero_rows']}  Dtypes: {', '.join(stats['dtypes'])}")
+    print(f"Estimated memory: {stats['memory_bytes']} bytes")
+    print(f"{'action':>12} {'min':>9} {'p25':>9} {'median':>9} {'p75':>9} {'max':>9} {'mean':>9} {'nonzero':>8}")
+    for row in stats["per_action"]:
+        print(f"{row['action']:>12} {row['min']:>9.3f} {row['p25']:>9.3f} {row['median']:>9.3f} "
+              f"{row['p75']:>9.3f} {row['max']:>9.3f} {row['mean']:>9.3f} {row['nonzero']:>8}")
+
+    if stats["most_visited"]:
+        print("Most visited states:")
+        for state, count, values in stats["most_visited"]:
+            values = "" if values is None else np.array2string(np.asarray(values, dtype=np.float64), precision=2)
+            print(f"  {count:>8}  {state}  {values}")
+    else:
+        print("No visits file found: visit statistics are unavailable.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and compact Q-tables.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser("report", help="Print statistics about a Q-table.")
+    report_parser.add_argument("q_table", help="Path of the Q-table pickle.")
+    report_parser.add_argument("--top", type=int, default=10, help="Number of most visited states to list.")
+
+    compact_parser = subparsers.add_parser("compact", help="Write a smaller copy of a Q-table.")
+    compact_parser.add_argument("q_table", help="Path of the Q-table pickle.")
+    compact_parser.add_argument("--output", help="Output path. Defaults to '<name>_compact.pkl'.")
+    compact_parser.add_argument("--dtype", choices=DTYPES, default="float32", help="Storage dtype of the rows.")
+    compact_parser.add_argument("--keep-zero-rows", action="store_true", help="Keep rows that were never updated.")
+    compact_parser.add_argument("--min-visits", type=int, default=0, help="Drop states updated fewer times than this.")
+
+    args = parser.parse_args(argv)
+    q_table, visit_counts = load_table(args.q_table)
+
+    if args.command == "report":
+        print_report(args.q_table, analyze(q_table, visit_counts, args.top))
+        return
+
+    output = args.output or args.q_table.replace(".pkl", "_compact.pkl")
+    compacted, compacted_visits = compact(
+        q_table, visit_counts, DTYPES[args.dtype], not args.keep_zero_rows, args.min_visits
+    )
+    save_table(output, compacted, compacted_visits)
+    print(f"Kept {len(compacted)}/{len(q_table)} states as {args.dtype}: "
+          f"{os.path.getsize(args.q_table)} -> {os.path.getsize(output)} bytes on disk, "
+          f"{estimate_memory(q_table)} -> {estimate_memory(compacted)} bytes in memory.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import random
+import numpy as np
+from config import QL_CONFIG
+from machine_learning.q_learning.agent import explore
+
+# Large odd multipliers used to hash tile coordinates into the weight array
+HASH_MULTIPLIER = 1_000_003
+HASH_MIX = 0x2545F4914F6CDD1D
+
+class TileCodingAgent:
+    continuous_states = True  # Consumes raw observations instead of discretized states
+
+    def __init__(self, state_size, action_size):
+        """
+        Initialize a linear Q-learning agent over tile-coded features of the raw observations.
+
+        Every observation activates one tile in each of several offset tilings. Tiles are hashed
+        into a single preallocated weight array, so memory is fixed by TILE_MEMORY_SIZE no matter
+        how many distinct observations are seen, and neighbouring observations share tiles,
+        which lets the agent generalize between them.
+        """
+        self.state_size = state_size  # Number of values in an observation
+        self.action_size = action_size  # The number of possible actions
+        self.num_tilings = QL_CONFIG["TILE_NUM_TILINGS"]
+        self.memory_size = QL_CONFIG["TILE_MEMORY_SIZE"]
+        self.tile_widths = np.array(
+            [QL_CONFIG["TILE_SPEED_WIDTH"]] + [QL_CONFIG["TILE_SENSOR_WIDTH"]] * (state_size - 1)
+        )
+        # Asymmetric offsets (1, 3, 5, ... per dimension) so the tilings do not line up diagonally
+        displacement = np.arange(1, 2 * state_size, 2)
+        self.offsets = (np.arange(self.num_tilings)[:, None] * displacement[None, :] / self.num_tilings) % 1
+        self.weights = np.zeros((self.memory_size, action_size))
+
+        self.q_table_path = os.path.join(
+            "machine_learning", "q_learning", "q_tables", os.path.splitext(QL_CONFIG["Q_TABLE_FILENAME"])[0] + "_tiles.npz"
+        )
+        self.learning_rate = QL_CONFIG["LEARNING_RATE"] / self.num_tilings  # Alpha, shared across tilings
+        self.discount_factor = QL_CONFIG["DISCOUNT_FACTOR"]  # Gamma
+        self.exploration_rate = QL_CONFIG["EXPLORATION_RATE"]  # Epsilon
+        self.exploration_decay = QL_CONFIG["EXPLORATION_DECAY"]  # Epsilon decay
+        self.min_exploration_rate = QL_CONFIG["MIN_EXPLORATION_RATE"]  # Minimum epsilon
+        self._cached_state, self._cached_tiles = None, None
+
+    def active_tiles(self, state):
+        """
+        Return the weight rows activated by an observation, one per tiling.
+
+        Args:
+            state (tuple): The raw observation (speed, sensor distances...).
+
+        Returns:
+            np.ndarray: Indices into the weight array.
+        """
+        if state == self._cached_state:
+            return self._cached_tiles
+
+        tiles = self._tiles(np.asarray(state, dtype=np.float64)[None, :])[0]
+        self._cached_state, self._cached_tiles = state, tiles
+        return tiles
+
+    def _tiles(self, observations):
+        """Return the active weight rows of a (batch, state_size) array of observations, as (batch, tilings)."""
+        coords = np.floor(observations[:, None, :] / self.tile_widths + self.offsets).astype(np.int64)
+        hashed = np.broadcast_to(np.arange(self.num_tilings, dtype=np.int64), coords.shape[:2])
+        for dim in range(coords.shape[2]):
+            hashed = hashed * HASH_MULTIPLIER + coords[:, :, dim]  # Wraps around on overflow, by design
+        return (hashed * HASH_MIX) % self.memory_size
+
+    def q_values(self, state):
+        """Return the estimated value of every action in a state."""
+        return self.weights[self.active_tiles(state)].sum(axis=0)
+
+    def get_action(self, state, use_epsilon=True):
+        """
+        Get an action based on the current state using epsilon-greedy strategy.
+
+        Args:
+            state: The current raw observation.
+            use_epsilon (bool): Whether to use epsilon-greedy exploration.
+                            If False, always choose the best action.
+
+        Returns:
+            int: The chosen action index.
+        """
+        if len(state) != self.state_size:
+            print(f"Warning: State has {len(state)} variables, but state_size is {self.state_size}")
+
+        if use_epsilon and random.uniform(0, 1) < self.exploration_rate:
+            return random.randint(0, self.action_size - 1)
+        return int(np.argmax(self.q_values(state)))
+
+    def get_actions(self, states, use_epsilon=True):
+        """
+        Get an action for each of many observations at once, using epsilon-greedy strategy.
+
+        Args:
+            states (list): Raw observations.
+            use_epsilon (bool): Whether to use epsilon-greedy exploration.
+
+        Returns:
+            np.ndarray: The chosen action index for each observation.
+        """
+        tiles = self._tiles(np.asarray(states, dtype=np.float64).reshape(len(states), self.state_size))
+        actions = np.argmax(self.weights[tiles].sum(axis=1), axis=1)
+        if use_epsilon:
+            explore(actions, self.exploration_rate, self.action_size)
+        return actions
+
+    def update_q_value(self, state, action, reward, next_state, steps=1):
+        """
+        Move the weights of the active tiles towards the Q-learning target.
+
+        Args:
+            state: The observation in which the action was chosen.
+            action (int): The chosen action index.
+            reward (float): The (discounted) reward collected while the action was applied.
+            next_state: The observation reached afterwards.
+            steps (int): Number of physics steps the action was repeated for.
+
+        Returns:
+            float: The TD error of the update.
+        """
+        next_value = np.max(self.q_values(next_state))
+        tiles = self.active_tiles(state)
+        td_error = reward + self.discount_factor ** steps * next_value - self.weights[tiles, action].sum()
+        # add.at, because two tilings may hash to the same row
+        np.add.at(self.weights[:, action], tiles, self.learning_rate * td_error)
+        return td_error
+
+    def reset_episode(self, seed=None):
+        """Prepare for a new episode. Linear Q-learning keeps no per-episode state."""
+
+    def decay_exploration(self):
+        """Gradually decay the exploration rate (epsilon)."""
+        self.exploration_rate = max(self.min_exploration_rate, self.exploration_rate * self.exploration_decay)
+
+    def table_size(self):
+        """Number of weight rows that have been updated at least once."""
+        return int(np.count_nonzero(self.weights.any(axis=1)))
+
+    def load_q_table(self):
+        """
+        Load the weights from a file. Returns True if successful, False if the file does not exist.
+        Raises ValueError if the file was saved with a different tile configuration.
+        """
+        try:
+            data = np.load(self.q_table_path)
+        except FileNotFoundError:
+            return False
+
+        if data["weights"].shape != self.weights.shape or data["num_tilings"] != self.num_tilings \
+                or not np.array_equal(data["tile_widths"], self.tile_widths):
+            raise ValueError(f"{self.q_table_path} was saved with a different tile coding configuration.")
+        self.weights[:] = data["weights"]
+        return True
+
+    def save_q_table(self):
+        """Save the weights and the tile configuration they belong to."""
+        np.savez(self.q_table_path, weights=self.weights, num_tilings=self.num_tilings, tile_widths=self.tile_widths)
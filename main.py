@@ -1,80 +1,180 @@
 import os
+import time
+import random
 import pygame
-from config import SESSION_CONFIG
+from config import SESSION_CONFIG, QL_CONFIG, FRAME_RATE
 from models.vehicle import Vehicle
 from models.environment import Environment
-from machine_learning.q_learning.agent import QLearningAgent
-from logs.logger import Logger
+from models.snapshot_buffer import SnapshotBuffer
+from models.termination import TerminationMonitor
+from machine_learning.agents import create_agent
+from machine_learning.q_learning.dyna_agent import DynaQAgent
+from machine_learning.q_learning.discretizer import AdaptiveDiscretizer, RawDiscretizer
+from logs.logger import Logger, get_log_name
+from logs.episode_archive import EpisodeArchive, EpisodeRecorder
+from logs.metrics_stream import MetricsPublisher
 
-def run_episode(environment, vehicle, agent, manual_control):
+def learn_from_decision(agent, vehicle, state, action, reward, steps):
+    """
+    Update the agent with the outcome of one decision.
+
+    Args:
+        agent (QLearningAgent): The Q-learning agent.
+        vehicle (Vehicle): The vehicle object, used to observe the next state.
+        state: The state in which the decision was made.
+        action (int): The action repeated during the decision.
+        reward (float): The discounted reward accumulated over the repeated steps.
+        steps (int): Number of physics steps the action was repeated for.
+    """
+    next_state = vehicle.get_state()
+    td_error = agent.update_q_value(state, action, round(reward, 1), next_state, steps)
+    vehicle.discretizer.observe(state, td_error)
+    agent.decay_exploration()
+
+def run_episode(environment, vehicle, agent, manual_control, recorder=None, spectator=None, termination=None):
     """
     Run a single episode of the simulation.
 
+    In a headless environment nothing is drawn and the episode lasts EPISODE_DURATION seconds
+    of simulated time (FRAME_RATE steps per second) instead of wall-clock time.
+
+    The agent chooses a new action every QL_CONFIG["DECISION_INTERVAL"] physics steps and
+    repeats it in between. Rewards are discounted and accumulated across the repeated steps,
+    and the Q-table is updated once per decision.
+
+    With a termination monitor, the episode also ends as soon as one of its rules fires; the
+    reason is left in vehicle.terminated and the final step is penalized.
+
     Args:
         environment (Environment): The game environment.
         vehicle (Vehicle): The vehicle object.
         agent (QLearningAgent): The Q-learning agent.
         manual_control (bool): Whether the vehicle is manually controlled.
+        recorder (EpisodeRecorder): Optional recorder for the agent's actions.
+        spectator (SnapshotBuffer): Optional shared buffer the vehicle is published to every step.
+        termination (TerminationMonitor): Optional early termination rules for the agent.
 
     Returns:
-        tuple: (score, window_closed) - The final score and whether the window was closed.
+        tuple: (score, window_closed, steps) - The final score, whether the window was closed
+               and the number of physics steps simulated.
     """
     start_ticks = pygame.time.get_ticks()
     run = True
     window_closed = False
+    learning = SESSION_CONFIG["TRAINING_MODE"]
+    decision_interval = max(1, QL_CONFIG["DECISION_INTERVAL"])
+    steps_since_decision = 0
+    steps = 0
+    if termination is not None:
+        termination.reset()
 
     while run:
-        clock = pygame.time.Clock()
-        clock.tick(60)  # Limit the frame rate to 60 FPS
-        environment.clear_screen()
+        if environment.headless:
+            # Without a window the simulation runs as fast as possible on simulated time
+            elapsed_time = steps / FRAME_RATE
+        else:
+            clock = pygame.time.Clock()
+            clock.tick(FRAME_RATE)  # Limit the frame rate to FRAME_RATE FPS
+            environment.clear_screen()
 
-        elapsed_time = (pygame.time.get_ticks() - start_ticks) / 1000
-        remaining_time = max(0, SESSION_CONFIG["EPISODE_DURATION"] - elapsed_time)
+            elapsed_time = (pygame.time.get_ticks() - start_ticks) / 1000
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                window_closed = True
-                break
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    run = False
+                    window_closed = True
+                    break
+
+        remaining_time = max(0, SESSION_CONFIG["EPISODE_DURATION"] - elapsed_time)
 
         if remaining_time == 0:
             run = False
             continue
 
-        environment.draw_circuit()
+        steps += 1
+        if not environment.headless:
+            environment.draw_circuit()
 
         if manual_control:
             vehicle.handle_manual_input()
             vehicle.calculate_reward()
         else:
-            state = vehicle.get_state()
-            # Use epsilon-greedy only in learning mode
-            action = agent.get_action(state, use_epsilon=SESSION_CONFIG["TRAINING_MODE"])
+            if steps_since_decision == 0:
+                state = vehicle.get_state()
+                # Use epsilon-greedy only in learning mode
+                action = agent.get_action(state, use_epsilon=learning)
+                decision_reward = 0
+
             vehicle.handle_agent_action(action)
+            if recorder is not None:
+                recorder.record(action)
             reward = vehicle.calculate_reward()
-            next_state = vehicle.get_state()
+            # A collision already ends the episode with its own penalty
+            if termination is not None and not vehicle.collided:
+                reason = termination.check(vehicle, steps)
+                if reason:
+                    reward += vehicle.terminate(reason)
+            decision_reward += agent.discount_factor ** steps_since_decision * reward
+            steps_since_decision += 1
 
-            if SESSION_CONFIG["TRAINING_MODE"]:
-                agent.update_q_value(state, action, round(reward, 1), next_state)
-                agent.decay_exploration()
+            if steps_since_decision == decision_interval or vehicle.collided or vehicle.terminated:
+                if learning:
+                    learn_from_decision(agent, vehicle, state, action, decision_reward, steps_since_decision)
+                steps_since_decision = 0
 
-        if vehicle.collided:
+        if vehicle.collided or vehicle.terminated:
             run = False
 
-        vehicle.draw(environment.window)
-        environment.draw_hud(vehicle, remaining_time)
-        pygame.display.update()
+        if spectator is not None:
+            spectator.publish(vehicle, remaining_time)
+
+        if not environment.headless:
+            vehicle.draw(environment.window)
+            environment.draw_hud(vehicle, remaining_time)
+            pygame.display.update()
+
+    # Learn from a decision cut short by the end of the episode
+    if learning and steps_since_decision > 0 and not window_closed:
+        learn_from_decision(agent, vehicle, state, action, decision_reward, steps_since_decision)
 
-    return vehicle.score, window_closed
+    return vehicle.score, window_closed, steps
+
+def create_discretizer(vehicle, agent):
+    """
+    Create the state discretizer selected by QL_CONFIG["DISCRETIZER"]. Agents that learn from
+    continuous states always get the raw observations.
+
+    Args:
+        vehicle (Vehicle): The vehicle, which provides the observation bounds.
+        agent (QLearningAgent): The agent, whose Q-values are copied into newly split states.
+
+    Returns:
+        The discretizer, or None to keep the vehicle's fixed buckets.
+    """
+    if agent.continuous_states:
+        return RawDiscretizer()
+    if QL_CONFIG["DISCRETIZER"] == "FIXED":
+        return None
+    if QL_CONFIG["DISCRETIZER"] != "ADAPTIVE":
+        raise ValueError(f"Unknown discretizer: {QL_CONFIG['DISCRETIZER']}")
+
+    def on_split(parent_state, left_state, right_state):
+        # The left child keeps the parent's key and Q-values; the right child starts from a copy
+        if parent_state in agent.q_table:
+            agent.q_table[right_state] = agent.q_table[parent_state].copy()
+
+    low, high, min_widths = vehicle.observation_bounds()
+    return AdaptiveDiscretizer(
+        low, high, min_widths, agent.action_size, QL_CONFIG["DISCRETIZER_MEMORY_BUDGET"],
+        QL_CONFIG["SPLIT_MIN_VISITS"], QL_CONFIG["SPLIT_MIN_VARIANCE"], on_split
+    )
 
 def main():
     """
     Main function to run the simulation.
     """
-    environment = Environment()
-    vehicle = Vehicle(environment)
     state_size, action_size = 6, 4
-    agent = QLearningAgent(state_size, action_size)
+    agent = create_agent(state_size, action_size)
 
     # Load Q-table based on mode
     if SESSION_CONFIG["TRAINING_MODE"]:
@@ -89,31 +189,109 @@ def main():
             print("Warning: No Q-table found for evaluation mode!")
             return
 
+    # Only open the window and load the circuit once there is something to run
+    environment = Environment(headless=SESSION_CONFIG["HEADLESS"])
+    vehicle = Vehicle(environment)
+
+    # Replace the fixed state buckets if configured; the adaptive tree is saved next to the Q-table
+    discretizer = create_discretizer(vehicle, agent)
+    discretizer_path = agent.q_table_path.replace(".pkl", "_discretizer.npz")
+    if discretizer is not None:
+        vehicle.discretizer = discretizer
+    if not isinstance(discretizer, AdaptiveDiscretizer):
+        discretizer = None  # Nothing to persist
+    elif discretizer.load(discretizer_path):
+        print(f"Discretizer loaded from {discretizer_path}")
+
     # Setup logging
-    q_table_filename = os.path.basename(agent.q_table_path)
-    log_filename = q_table_filename.replace(".pkl", ".txt")
-    logger = Logger(os.path.join("q_learning", log_filename))
+    log_name = get_log_name(QL_CONFIG["Q_TABLE_FILENAME"], QL_CONFIG["AGENT"], QL_CONFIG["DISCRETIZER"])
+    logger = Logger(os.path.join("q_learning", f"{log_name}.txt"))
+    termination_logger = Logger(os.path.join("q_learning", f"{log_name}_terminations.txt"))
+
+    # End agent episodes early once they stop producing useful experience
+    termination = None
+    if TerminationMonitor.is_enabled(SESSION_CONFIG["TRAINING_MODE"]) and not SESSION_CONFIG["MANUAL_CONTROL"]:
+        termination = TerminationMonitor(environment)
+
+    # Setup episode recording next to the logs
+    record_episodes = SESSION_CONFIG["RECORD_EPISODES"] and not SESSION_CONFIG["MANUAL_CONTROL"]
+    archive = EpisodeArchive(os.path.join("q_learning", f"{log_name}_episodes"))
+    base_seed = SESSION_CONFIG["SEED"]
+    if base_seed is None:
+        base_seed = random.SystemRandom().randrange(2**31)
+
+    # Publish vehicle snapshots for spectator viewers, if configured
+    spectator = None
+    if SESSION_CONFIG["SPECTATOR_BUFFER"]:
+        try:
+            spectator = SnapshotBuffer(SESSION_CONFIG["SPECTATOR_BUFFER"], create=True,
+                                       track_id=environment.track_id, sensor_count=len(vehicle.sensors))
+        except FileExistsError as error:
+            print(error)
+            pygame.quit()
+            return
+        print(f"Spectators can attach to '{SESSION_CONFIG['SPECTATOR_BUFFER']}'")
+
+    # Stream per-episode metrics to a live plotter, if configured
+    publisher = None
+    if SESSION_CONFIG["METRICS_SOCKET"]:
+        publisher = MetricsPublisher(SESSION_CONFIG["METRICS_SOCKET"])
 
     num_episodes = 1 if SESSION_CONFIG["MANUAL_CONTROL"] else SESSION_CONFIG["NUM_EPISODES"]
 
+    # Dyna-Q can plan on a background thread while the simulation runs
+    background_planning = isinstance(agent, DynaQAgent) and QL_CONFIG["DYNA_BACKGROUND"]
+    if background_planning and SESSION_CONFIG["TRAINING_MODE"]:
+        agent.start_background_planning()
+
     for episode in range(num_episodes):
         print(f"Starting episode {episode + 1}/{num_episodes}")
         vehicle.reset()
-        score, window_closed = run_episode(
-            environment, vehicle, agent, SESSION_CONFIG["MANUAL_CONTROL"]
+        seed = base_seed + episode
+        random.seed(seed)
+        agent.reset_episode(seed)
+        recorder = EpisodeRecorder() if record_episodes else None
+        start_time = time.perf_counter()
+        score, window_closed, steps = run_episode(
+            environment, vehicle, agent, SESSION_CONFIG["MANUAL_CONTROL"], recorder, spectator, termination
         )
+        steps_per_second = steps / max(time.perf_counter() - start_time, 1e-9)
 
         if window_closed:
             print("Window closed. Ending session.")
             break
 
+        if vehicle.terminated:
+            print(f"Episode {episode + 1} ended early after {steps} steps: {vehicle.terminated}")
+            termination_logger.log_termination(episode + 1, steps, vehicle.terminated)
+
+        if recorder is not None:
+            archive.append(seed, environment.track_id, recorder, score, termination is not None)
+
         # Save Q-table and log score only in training mode
         if not SESSION_CONFIG["MANUAL_CONTROL"] and SESSION_CONFIG["TRAINING_MODE"]:
             agent.save_q_table()
             logger.log_score(score)
+            if discretizer is not None:
+                discretizer.save(discretizer_path)
+                print(f"Discretizer stats: {discretizer.stats()}")
+
+        if publisher is not None:
+            publisher.publish(episode + 1, score, agent.exploration_rate, steps, agent.table_size(), steps_per_second)
 
         mode = "Training" if SESSION_CONFIG["TRAINING_MODE"] else "Evaluation"
-        print(f"{mode} episode {episode + 1} completed. Score: {score}")
+        laps = f", laps: {vehicle.laps} (best {min(vehicle.lap_times):.2f} s)" if vehicle.lap_times else ""
+        print(f"{mode} episode {episode + 1} completed. Score: {score}{laps}")
+
+    if publisher is not None:
+        publisher.close()
+
+    if spectator is not None:
+        spectator.close()
+
+    if background_planning:
+        agent.stop_background_planning()
+        print(f"Dyna-Q planning updates: {agent.planning_updates}")
 
     pygame.quit()
 
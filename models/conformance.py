@@ -0,0 +1,258 @@
+import sys
+import os
+import time
+import random
+import argparse
+from collections import deque
+
+# Add the parent directory to the path (for config.py, models and machine_learning)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from config import FRAME_RATE
+from models.environment import Environment
+from models.vehicle import Vehicle
+from models.fast_engine import FastVehicle, TrackMasks
+from models.termination import TerminationMonitor
+from machine_learning.q_learning.agent import QLearningAgent
+
+# Action distribution of the random actions mixed into the generated streams
+ACTION_WEIGHTS = [0.55, 0.2, 0.2, 0.05]
+RANDOM_ACTION_RATE = 0.1  # Share of random actions, so streams take different lines around the circuit
+CONTEXT_STEPS = 5  # Steps of history included in a divergence report
+
+
+class Divergence(Exception):
+    def __init__(self, episode, step, field, reference, alternative, context):
+        """Raised at the first step where the alternative engine disagrees with the reference."""
+        self.episode = episode
+        self.step = step
+        self.field = field
+        self.reference = reference
+        self.alternative = alternative
+        self.context = context
+        super().__init__(f"Episode {episode}, step {step}: {field} differs "
+                         f"(reference={reference!r}, alternative={alternative!r})")
+
+    def report(self):
+        """Return a multi-line description of the divergence and the steps leading to it."""
+        lines = [str(self), "Recent steps (oldest first):"]
+        for entry in self.context:
+            lines.append("  " + ", ".join(f"{key}={value!r}" for key, value in entry.items()))
+        return "\n".join(lines)
+
+
+def follow_road(vehicle):
+    """Steer towards the side with more road ahead, accelerating when the way is clear."""
+    distances = [sensor.distance for sensor in vehicle.sensors]
+    right, front, left = distances[0] + distances[1], distances[2], distances[3] + distances[4]
+    if abs(left - right) > 20 or front < 60:
+        return 1 if left > right else 2
+    return 0
+
+
+def generate_actions(vehicle, seed, num_steps):
+    """
+    Generate a reproducible action stream that travels the circuit.
+
+    The vehicle follows the road with some random actions mixed in, and the stream ends where it
+    collides. Purely random streams crash within a few seconds and never test the engines beyond
+    the first bend.
+
+    Args:
+        vehicle (Vehicle): The reference vehicle, driven to produce the stream.
+        seed (int): Seed of the random actions.
+        num_steps (int): Maximum length of the stream.
+
+    Returns:
+        list: The actions.
+    """
+    rng = random.Random(seed)
+    vehicle.reset()
+    actions = []
+    for _ in range(num_steps):
+        if rng.random() < RANDOM_ACTION_RATE:
+            action = rng.choices(range(len(ACTION_WEIGHTS)), weights=ACTION_WEIGHTS)[0]
+        else:
+            action = follow_road(vehicle)
+        actions.append(action)
+        vehicle.handle_agent_action(action)
+        vehicle.calculate_reward()  # As in compare_episode, in case rewards ever feed back into the physics
+        if vehicle.collided:
+            break
+    return actions
+
+
+def snapshot(vehicle, reward, checkpoint_reward):
+    """Everything observable about one step of a vehicle."""
+    return {
+        "x": vehicle.x, "y": vehicle.y, "angle": vehicle.angle, "speed": vehicle.speed,
+        "sensors": tuple(sensor.distance for sensor in vehicle.sensors),
+        "sensor_on_road": tuple(sensor.is_on_road for sensor in vehicle.sensors),
+        "road_status": vehicle.check_road_status(vehicle.x, vehicle.y),
+        "state": vehicle.get_state(), "reward": reward, "checkpoint_reward": checkpoint_reward,
+        "score": vehicle.score, "collided": vehicle.collided
+    }
+
+
+def q_values_match(reference, alternative, tolerance):
+    """Compare two Q-value rows exactly, or within an absolute tolerance."""
+    reference, alternative = np.asarray(reference, dtype=np.float64), np.asarray(alternative, dtype=np.float64)
+    if tolerance == 0:
+        return np.array_equal(reference, alternative)
+    return np.allclose(reference, alternative, rtol=0, atol=tolerance)
+
+
+def compare_episode(episode, actions, reference, alternative, reference_agent, alternative_agent, q_tolerance):
+    """
+    Drive both vehicles and agents with the same action stream and compare them after every step.
+
+    Raises:
+        Divergence: At the first step where any compared value differs.
+
+    Returns:
+        tuple: (steps compared, checkpoints crossed, laps completed)
+    """
+    reference.reset()
+    alternative.reset()
+    reference_checkpoints, alternative_checkpoints = {}, {}
+    context = deque(maxlen=CONTEXT_STEPS)
+    checkpoints_crossed = 0
+
+    for step, action in enumerate(actions):
+        states = (reference.get_state(), alternative.get_state())
+        outcomes = []
+        for vehicle, checkpoints in ((reference, reference_checkpoints), (alternative, alternative_checkpoints)):
+            vehicle.handle_agent_action(action)
+            reward = vehicle.calculate_reward()
+            checkpoint_reward = vehicle.check_checkpoint(step / FRAME_RATE, checkpoints)
+            outcomes.append(snapshot(vehicle, reward, checkpoint_reward))
+
+        reference_step, alternative_step = outcomes
+        context.append({"step": step, "action": action, **reference_step})
+        for field, value in reference_step.items():
+            if alternative_step[field] != value:
+                raise Divergence(episode, step, field, value, alternative_step[field], list(context))
+
+        # Both agents learn from their own engine's transition; their Q-values must stay in lockstep
+        reference_error = reference_agent.update_q_value(states[0], action, reference_step["reward"], reference_step["state"])
+        alternative_error = alternative_agent.update_q_value(states[1], action, alternative_step["reward"], alternative_step["state"])
+        if not q_values_match(reference_agent.q_table[states[0]], alternative_agent.q_table[states[1]], q_tolerance):
+            raise Divergence(episode, step, f"q_values{states[0]}", reference_agent.q_table[states[0]],
+                             alternative_agent.q_table[states[1]], list(context))
+        if not q_values_match(reference_error, alternative_error, q_tolerance):
+            raise Divergence(episode, step, "td_error", reference_error, alternative_error, list(context))
+
+        if reference_step["checkpoint_reward"] > 0:
+            checkpoints_crossed += 1
+        if reference_step["collided"]:
+            return step + 1, checkpoints_crossed, reference.laps
+    return len(actions), checkpoints_crossed, reference.laps
+
+
+def measure_throughput(vehicle, action_streams):
+    """
+    Time the simulation of the given action streams on one vehicle.
+
+    Returns:
+        float: Simulated steps per second.
+    """
+    steps = 0
+    start = time.perf_counter()
+    for actions in action_streams:
+        vehicle.reset()
+        for action in actions:
+            vehicle.handle_agent_action(action)
+            vehicle.calculate_reward()
+            vehicle.get_state()
+            steps += 1
+            if vehicle.collided:
+                break
+    return steps / max(time.perf_counter() - start, 1e-9)
+
+
+def load_agent(q_table_path):
+    """Create an agent, loading a Q-table if a path is given. Exploration is irrelevant here."""
+    agent = QLearningAgent(6, 4)
+    if q_table_path:
+        agent.q_table_path = q_table_path
+        agent.visits_path = agent.q_table_path.replace(".pkl", "_visits.pkl")
+        if not agent.load_q_table():
+            raise FileNotFoundError(f"No Q-table found at {q_table_path}")
+    return agent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check that the mask-based engine behaves exactly like the get_at reference, step by step."
+    )
+    parser.add_argument("--episodes", type=int, default=20, help="Number of action streams to compare.")
+    parser.add_argument("--steps", type=int, default=1200, help="Maximum steps per action stream.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first action stream.")
+    parser.add_argument("--archive", help="Compare recorded episodes from this archive (relative to logs, "
+                                          "without extension) instead of generated streams.")
+    parser.add_argument("--q-table", help="Q-table the reference agent starts from.")
+    parser.add_argument("--alt-q-table", help="Q-table the alternative agent starts from (e.g. a compacted copy). "
+                                              "Defaults to --q-table.")
+    parser.add_argument("--q-tolerance", type=float, default=0.0,
+                        help="Absolute tolerance for Q-values (0 requires identical values).")
+    parser.add_argument("--min-steps", type=int,
+                        help="Fail unless at least this many steps are compared. "
+                             "Defaults to half of --episodes x --steps for generated streams.")
+    parser.add_argument("--min-checkpoints", type=int, default=1,
+                        help="Fail unless the reference crosses at least this many checkpoints "
+                             "(laps, on circuits without checkpoints).")
+    args = parser.parse_args(argv)
+
+    environment = Environment(headless=True)
+    reference = Vehicle(environment)
+    alternative = FastVehicle(environment, masks=TrackMasks(environment))
+    reference_agent = load_agent(args.q_table)
+    alternative_agent = load_agent(args.alt_q_table or args.q_table)
+
+    min_steps = args.min_steps or 0
+    if args.archive:
+        from logs.episode_archive import EpisodeArchive
+        archive = EpisodeArchive(args.archive)
+        episode_ids = range(max(0, len(archive) - args.episodes), len(archive))
+        action_streams = [archive.read(episode_id)["actions"] for episode_id in episode_ids]
+    else:
+        action_streams = [generate_actions(reference, args.seed + episode, args.steps)
+                          for episode in range(args.episodes)]
+        if args.min_steps is None:
+            min_steps = args.episodes * args.steps // 2
+
+    total_steps = total_checkpoints = total_laps = 0
+    try:
+        for episode, actions in enumerate(action_streams):
+            steps, checkpoints, laps = compare_episode(episode, actions, reference, alternative,
+                                                       reference_agent, alternative_agent, args.q_tolerance)
+            total_steps += steps
+            total_checkpoints += checkpoints
+            total_laps += laps
+    except Divergence as divergence:
+        print(divergence.report())
+        return 1
+
+    # Identical engines prove little if the streams end before reaching most of the circuit
+    if TerminationMonitor.has_checkpoints(environment):
+        milestones, milestone_name = total_checkpoints, "checkpoints crossed"
+    else:
+        milestones, milestone_name = total_laps, "laps completed"
+    if total_steps < min_steps or milestones < args.min_checkpoints:
+        print(f"Conformance inconclusive: only {total_steps} steps compared (minimum {min_steps}) "
+              f"and {milestones} {milestone_name} (minimum {args.min_checkpoints}).")
+        return 1
+
+    print(f"Conformance OK: {len(action_streams)} episodes, {total_steps} steps identical "
+          f"(states, rewards, collisions, checkpoints and Q-values), {milestones} {milestone_name}.")
+
+    reference_rate = measure_throughput(reference, action_streams)
+    alternative_rate = measure_throughput(alternative, action_streams)
+    print(f"Throughput: reference {reference_rate:,.0f} steps/s, alternative {alternative_rate:,.0f} steps/s "
+          f"({alternative_rate / reference_rate:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
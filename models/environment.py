@@ -1,10 +1,20 @@
 import os
 import pygame
 import math
-from config import WINDOW_CONFIG, COLOR_CONFIG, FONT_CONFIG
+from config import WINDOW_CONFIG, COLOR_CONFIG, FONT_CONFIG, CIRCUIT_CONFIG, PROGRESS_CONFIG
 
 class Environment:
-    def __init__(self):
+    def __init__(self, headless=False, track_id=None):
+        """
+        Initialize the environment and load the circuit.
+
+        Args:
+            headless (bool): Render into an off-screen surface instead of opening a window.
+            track_id (int): Circuit to load. Defaults to CIRCUIT_CONFIG["TRACK_ID"].
+        """
+        self.headless = headless
+        self.track_id = CIRCUIT_CONFIG["TRACK_ID"] if track_id is None else track_id
+
         # Attributes: Dimensions
         self.SCREEN_WIDTH = WINDOW_CONFIG["WIDTH"]
         self.SCREEN_HEIGHT = WINDOW_CONFIG["HEIGHT"]
@@ -27,17 +37,30 @@ class Environment:
         self.FONT_BIG = pygame.font.Font(None, FONT_CONFIG["BIG"])
         self.FONT_SMALL = pygame.font.Font(None, FONT_CONFIG["SMALL"])
 
-        # Configure the PyGame window
-        self.window = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption("Self Driving AI")
+        # Configure the PyGame window (or an off-screen surface when headless)
+        if self.headless:
+            self.window = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+        else:
+            self.window = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+            pygame.display.set_caption("Self Driving AI")
 
         # Get the absolute path of the directory where the .py file is running
         parent_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        circuit_image_path = os.path.join(parent_directory, "assets/images/circuit_2.png")
+        circuit_image_path = os.path.join(parent_directory, f"assets/images/circuit_{self.track_id}.png")
 
-        # Load the circuit image from the relative path
-        self.CIRCUIT_IMAGE = pygame.image.load(circuit_image_path).convert()
+        # Load the circuit image from the relative path, in the pixel format of the render target
+        self.CIRCUIT_IMAGE = pygame.image.load(circuit_image_path).convert(self.window)
         self.CIRCUIT_IMAGE = pygame.transform.scale(self.CIRCUIT_IMAGE, (self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+        self.progress_field = None  # Loaded on first use
+
+    def get_progress_field(self):
+        """Return the circuit's track progress field, loading (or precomputing) it on first use."""
+        if self.progress_field is None:
+            from models.progress_field import ProgressField
+            parent_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_directory = os.path.join(parent_directory, PROGRESS_CONFIG["CACHE_DIRECTORY"])
+            self.progress_field = ProgressField.load_or_compute(self, cache_directory)
+        return self.progress_field
 
     def find_start_position(self):
         """Find the first pixel with the start color and determine the initial direction."""
@@ -0,0 +1,146 @@
+import os
+import math
+import heapq
+import hashlib
+import numpy as np
+import pygame
+from models.fast_engine import TrackMasks
+
+# Bump when the computation changes, so stale cached fields are not reused
+FIELD_VERSION = 1
+DIAGONAL = math.sqrt(2)
+
+
+class ProgressField:
+    def __init__(self, distances, lap_length):
+        """
+        Per-pixel distance along the circuit, measured from the start line in the driving direction.
+
+        Args:
+            distances (np.ndarray): Progress of every pixel, indexed [x, y]. -1 off the road.
+            lap_length (float): Progress gained by one full lap.
+        """
+        self.distances = distances
+        self.lap_length = lap_length
+        self.width, self.height = distances.shape
+
+    def at(self, x, y):
+        """Return the progress at a position, or -1 if it is off the road or outside the circuit."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return float(self.distances[int(x), int(y)])
+        return -1.0
+
+    @classmethod
+    def load_or_compute(cls, environment, cache_directory):
+        """
+        Load the field of the environment's circuit from the cache, computing and caching it if needed.
+
+        The cache file name includes a hash of the circuit image, so edited circuits are recomputed.
+
+        Args:
+            environment (Environment): The environment whose circuit is measured.
+            cache_directory (str): Directory of the cached fields.
+
+        Returns:
+            ProgressField: The field.
+        """
+        image_hash = hashlib.sha1(pygame.image.tostring(environment.CIRCUIT_IMAGE, "RGB"))
+        image_hash.update(f"v{FIELD_VERSION}".encode())
+        cache_path = os.path.join(
+            cache_directory, f"progress_{environment.track_id}_{image_hash.hexdigest()[:16]}.npz"
+        )
+        try:
+            with np.load(cache_path) as cached:
+                return cls(cached["distances"], float(cached["lap_length"]))
+        except FileNotFoundError:
+            pass
+
+        print(f"Precomputing the track progress field of circuit {environment.track_id}...")
+        distances, lap_length = cls.compute(environment)
+        os.makedirs(cache_directory, exist_ok=True)
+        np.savez(cache_path, distances=distances, lap_length=lap_length)
+        return cls(distances, lap_length)
+
+    @staticmethod
+    def compute(environment):
+        """
+        Compute the shortest-path distance over the road from the start line, in the start direction.
+
+        A barrier is drawn across the road through the start marker, perpendicular to the start
+        direction. Distances are propagated (8-connected Dijkstra) from the road pixels just in
+        front of the barrier and cannot cross it, so they grow all the way around the circuit
+        and reach the lap length just behind the start line.
+
+        Args:
+            environment (Environment): The environment whose circuit is measured.
+
+        Returns:
+            tuple: (distances indexed [x, y] as float32 with -1 off the road, lap length)
+        """
+        road = TrackMasks(environment).road
+        width, height = road.shape
+        start = np.all(pygame.surfarray.array3d(environment.CIRCUIT_IMAGE) == environment.START_COLOR, axis=2)
+        start_x, start_y = np.nonzero(start)
+        center = np.array([start_x.mean(), start_y.mean()])
+        angle = math.radians(environment.find_start_position()[2])
+        forward = np.array([math.cos(angle), -math.sin(angle)])
+        across = np.array([-forward[1], forward[0]])
+
+        # Two pixels thick, so that diagonal steps cannot slip through it
+        barrier = np.zeros_like(road)
+        for side in (1, -1):
+            offset = 0.0
+            while True:
+                point = center + side * offset * across
+                x, y = int(round(point[0])), int(round(point[1]))
+                if not (0 <= x < width and 0 <= y < height and road[x, y]):
+                    break
+                barrier[x, y] = True
+                behind_x, behind_y = int(round(point[0] - forward[0])), int(round(point[1] - forward[1]))
+                if 0 <= behind_x < width and 0 <= behind_y < height and road[behind_x, behind_y]:
+                    barrier[behind_x, behind_y] = True
+                offset += 0.5
+
+        # Flattened [x, y] grid with an off-road border, so neighbours never wrap around
+        passable = np.zeros((width + 2, height + 2), dtype=bool)
+        passable[1:-1, 1:-1] = road & ~barrier
+        passable = passable.ravel()
+        stride = height + 2
+        neighbours = [(stride, 1.0), (-stride, 1.0), (1, 1.0), (-1, 1.0),
+                      (stride + 1, DIAGONAL), (stride - 1, DIAGONAL), (-stride + 1, DIAGONAL), (-stride - 1, DIAGONAL)]
+
+        # Road pixels touching the barrier, split by the side of the start line they are on
+        seeds, behind = [], []
+        for x, y in zip(*np.nonzero(barrier)):
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    index = (x + dx + 1) * stride + (y + dy + 1)
+                    if passable[index]:
+                        side = (x + dx - center[0]) * forward[0] + (y + dy - center[1]) * forward[1]
+                        (seeds if side > 0 else behind).append(index)
+
+        distances = np.full(passable.shape, np.inf)
+        queue = []
+        for index in set(seeds):
+            distances[index] = 0.0
+            queue.append((0.0, index))
+        heapq.heapify(queue)
+        while queue:
+            distance, index = heapq.heappop(queue)
+            if distance > distances[index]:
+                continue
+            for step, cost in neighbours:
+                neighbour = index + step
+                if passable[neighbour] and distance + cost < distances[neighbour]:
+                    distances[neighbour] = distance + cost
+                    heapq.heappush(queue, (distance + cost, neighbour))
+
+        reached_behind = [distances[index] for index in set(behind) if np.isfinite(distances[index])]
+        if not reached_behind:
+            raise ValueError(f"Circuit {environment.track_id} does not lead back to its start line.")
+        lap_length = float(np.mean(reached_behind)) + 1  # Plus the step across the barrier
+
+        distances = distances.reshape(width + 2, height + 2)[1:-1, 1:-1]
+        distances[barrier] = 0.0
+        distances[~np.isfinite(distances)] = -1.0
+        return distances.astype(np.float32), lap_length
@@ -23,12 +23,7 @@ class Sensor:
         Update the sensor's position and calculate the distance to the first obstacle.
         :param environment: The environment in which the vehicle and sensor operate
         """
-        # Calculate the sensor angle based on the vehicle's orientation and offset
-        sensor_angle = math.radians(self.vehicle.angle + self.angle_offset)
-        
-        # Update the sensor's endpoint coordinates
-        self.end_x = self.vehicle.x + self.length * math.cos(sensor_angle)
-        self.end_y = self.vehicle.y - self.length * math.sin(sensor_angle)
+        self.update_endpoint()
 
         # Check if the vehicle is currently on the road
         self.is_on_road = self.vehicle.is_on_road(self.vehicle.x, self.vehicle.y)
@@ -36,6 +31,15 @@ class Sensor:
         # Calculate the distance from the sensor to the first detected obstacle
         self.distance = self._calculate_distance(environment)
 
+    def update_endpoint(self):
+        """Update the sensor's endpoint coordinates from the vehicle's position and orientation."""
+        # Calculate the sensor angle based on the vehicle's orientation and offset
+        sensor_angle = math.radians(self.vehicle.angle + self.angle_offset)
+        
+        # Update the sensor's endpoint coordinates
+        self.end_x = self.vehicle.x + self.length * math.cos(sensor_angle)
+        self.end_y = self.vehicle.y - self.length * math.sin(sensor_angle)
+
     def _calculate_distance(self, environment):
         """
         Calculate the distance to the first obstacle the sensor detects.
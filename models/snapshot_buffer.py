@@ -0,0 +1,110 @@
+import struct
+from multiprocessing import shared_memory, resource_tracker
+
+DEFAULT_BUFFER_NAME = "self_driving_ai_spectator"
+
+# active slot, seqlock counter of slot 0, seqlock counter of slot 1, generation, track ID, sensor count
+HEADER = struct.Struct("<QQQQII")
+GENERATION_OFFSET = 24
+# Each slot: generation, then x, y, angle, speed, score, remaining time, then the sensor distances
+VEHICLE_FIELDS = 6
+
+
+class SnapshotBuffer:
+    def __init__(self, name=DEFAULT_BUFFER_NAME, create=False, track_id=0, sensor_count=5):
+        """
+        Open a shared-memory double buffer of vehicle snapshots.
+
+        The trainer (create=True) owns the buffer and writes every step into the slot that is
+        not being read, then flips the active slot. Each slot has a seqlock counter that is odd
+        while it is being written, so readers can detect torn reads and retry; the writer never
+        waits for readers. Every snapshot also carries a global generation number, which increases
+        by one per publish, so readers can tell new snapshots from ones they have already seen.
+
+        Args:
+            name (str): Name of the shared memory block.
+            create (bool): Create the block (trainer) instead of attaching to it (viewer).
+            track_id (int): Circuit the trainer runs on, stored for viewers.
+            sensor_count (int): Number of sensor distances per snapshot.
+        """
+        self.owner = create
+        if create:
+            self.slot = struct.Struct(f"<Q{VEHICLE_FIELDS + sensor_count}d")
+            size = HEADER.size + 2 * self.slot.size
+            try:
+                self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                # Never take over the buffer: it may belong to a trainer that is still running
+                raise FileExistsError(
+                    f"A snapshot buffer named '{name}' already exists. Another trainer is publishing to it, "
+                    f"or one did not shut down cleanly. Choose another name (--spectate NAME), or remove "
+                    f"/dev/shm/{name} if no trainer is running."
+                ) from None
+            HEADER.pack_into(self.memory.buf, 0, 0, 0, 0, 0, track_id, sensor_count)
+        else:
+            self.memory = shared_memory.SharedMemory(name)
+            # Attaching must not make this process responsible for removing the block on exit
+            resource_tracker.unregister(self.memory._name, "shared_memory")
+            sensor_count = HEADER.unpack_from(self.memory.buf, 0)[5]
+            self.slot = struct.Struct(f"<Q{VEHICLE_FIELDS + sensor_count}d")
+
+        self.track_id, self.sensor_count = HEADER.unpack_from(self.memory.buf, 0)[4:]
+
+    def _slot_offset(self, slot):
+        return HEADER.size + slot * self.slot.size
+
+    def publish(self, vehicle, remaining_time):
+        """
+        Write a snapshot of the vehicle. Only called by the owner; never blocks.
+
+        Args:
+            vehicle (Vehicle): The vehicle to snapshot.
+            remaining_time (float): Remaining episode time, for the HUD.
+        """
+        buf = self.memory.buf
+        active, seq0, seq1, generation = HEADER.unpack_from(buf, 0)[:4]
+        slot = 1 - active
+        seq = seq1 if slot else seq0
+        seq_offset = 8 + 8 * slot
+        generation += 1
+
+        struct.pack_into("<Q", buf, seq_offset, seq + 1)  # Odd: write in progress
+        self.slot.pack_into(buf, self._slot_offset(slot), generation, vehicle.x, vehicle.y, vehicle.angle,
+                            vehicle.speed, vehicle.score, remaining_time,
+                            *(sensor.distance for sensor in vehicle.sensors))
+        struct.pack_into("<Q", buf, seq_offset, seq + 2)  # Even: stable
+        struct.pack_into("<Q", buf, GENERATION_OFFSET, generation)
+        struct.pack_into("<Q", buf, 0, slot)
+
+    def read(self, attempts=3):
+        """
+        Read the latest complete snapshot.
+
+        Args:
+            attempts (int): How many times to retry when the writer overtakes the read.
+
+        Returns:
+            dict: x, y, angle, speed, score, remaining_time, sensors and sequence (the snapshot's
+                  generation, unique per publish), or None if no complete snapshot could be read
+                  (nothing published yet or the writer kept overtaking).
+        """
+        buf = self.memory.buf
+        for _ in range(attempts):
+            active = HEADER.unpack_from(buf, 0)[0]
+            seq_offset = 8 + 8 * active
+            seq_before = struct.unpack_from("<Q", buf, seq_offset)[0]
+            if seq_before == 0 or seq_before % 2:
+                continue
+            values = self.slot.unpack_from(buf, self._slot_offset(active))
+            if struct.unpack_from("<Q", buf, seq_offset)[0] == seq_before:
+                generation, x, y, angle, speed, score, remaining_time = values[:VEHICLE_FIELDS + 1]
+                return {"x": x, "y": y, "angle": angle, "speed": speed, "score": score,
+                        "remaining_time": remaining_time, "sensors": values[VEHICLE_FIELDS + 1:],
+                        "sequence": generation}
+        return None
+
+    def close(self):
+        """Detach from the buffer; the owner also removes it."""
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,86 @@
+import pygame
+from config import TERMINATION_CONFIG, PROGRESS_CONFIG, FRAME_RATE
+
+
+class TerminationMonitor:
+    def __init__(self, environment):
+        """
+        Decide when an agent episode has stopped producing useful experience.
+
+        Three rules are evaluated every tick, each disabled by setting its limit to 0:
+        the vehicle stays below STALL_SPEED for STALL_TICKS consecutive ticks ("stalled"),
+        it makes no new progress along the circuit (or, without a progress field, crosses no
+        new checkpoint) within CHECKPOINT_TICKS ("no_progress"), or it spends more than
+        MAX_CELL_TICKS in total in one position cell ("circling").
+
+        Args:
+            environment (Environment): The environment, checked once for checkpoints.
+        """
+        self.stall_speed = TERMINATION_CONFIG["STALL_SPEED"]
+        self.stall_ticks = TERMINATION_CONFIG["STALL_TICKS"]
+        self.checkpoint_ticks = TERMINATION_CONFIG["CHECKPOINT_TICKS"]
+        self.cell_size = TERMINATION_CONFIG["CELL_SIZE"]
+        self.max_cell_ticks = TERMINATION_CONFIG["MAX_CELL_TICKS"]
+
+        # Circuits without checkpoints would end every episode on the progress rule
+        if self.checkpoint_ticks and not PROGRESS_CONFIG["ENABLED"] and not self.has_checkpoints(environment):
+            print("No checkpoints on this circuit: the no-progress termination rule is disabled.")
+            self.checkpoint_ticks = 0
+        self.reset()
+
+    @staticmethod
+    def is_enabled(training):
+        """Check if agent episodes are ended early in training (True) or evaluation (False) mode."""
+        return TERMINATION_CONFIG["ENABLED"] and (training or not TERMINATION_CONFIG["TRAINING_ONLY"])
+
+    @staticmethod
+    def has_checkpoints(environment):
+        """Check if the circuit image contains any checkpoint pixel."""
+        checkpoint_mask = pygame.mask.from_threshold(
+            environment.CIRCUIT_IMAGE, environment.CHECKPOINT_COLOR, (1, 1, 1, 255)
+        )
+        return checkpoint_mask.count() > 0
+
+    def reset(self):
+        """Forget the previous episode."""
+        self.stalled_ticks = 0
+        self.last_progress_tick = 0
+        self.best_progress = 0.0
+        self.checkpoints = {}  # Checkpoints crossed this episode, as used by Vehicle.check_checkpoint
+        self.cell_ticks = {}  # Ticks spent in each position cell
+
+    def check(self, vehicle, tick):
+        """
+        Evaluate the rules after the vehicle has moved and its reward has been calculated.
+
+        Args:
+            vehicle (Vehicle): The vehicle.
+            tick (int): Number of physics steps simulated so far in the episode.
+
+        Returns:
+            str: The reason to end the episode, or None to continue.
+        """
+        if self.stall_ticks:
+            self.stalled_ticks = self.stalled_ticks + 1 if vehicle.speed < self.stall_speed else 0
+            if self.stalled_ticks >= self.stall_ticks:
+                return "stalled"
+
+        if self.checkpoint_ticks:
+            if vehicle.progress_field is not None:
+                progressed = vehicle.best_progress > self.best_progress
+                self.best_progress = vehicle.best_progress
+            else:
+                progressed = vehicle.check_checkpoint(tick / FRAME_RATE, self.checkpoints)
+            if progressed:
+                self.last_progress_tick = tick
+            elif tick - self.last_progress_tick >= self.checkpoint_ticks:
+                return "no_progress"
+
+        if self.max_cell_ticks:
+            cell = (int(vehicle.x) // self.cell_size, int(vehicle.y) // self.cell_size)
+            ticks = self.cell_ticks.get(cell, 0) + 1
+            self.cell_ticks[cell] = ticks
+            if ticks > self.max_cell_ticks:
+                return "circling"
+
+        return None
@@ -3,11 +3,16 @@ import time
 import pygame
 from models.sensor import Sensor
 from models.checkpoint import Checkpoint
-from config import VEHICLE_CONFIG
+from machine_learning.q_learning.discretizer import FixedDiscretizer
+from config import VEHICLE_CONFIG, TERMINATION_CONFIG, PROGRESS_CONFIG, FRAME_RATE
+
 
 class Vehicle:
-    def __init__(self, environment):
+    sensor_class = Sensor  # Sensor implementation, replaceable by subclasses
+
+    def __init__(self, environment, discretizer=None):
         self.environment = environment
+        self.discretizer = discretizer if discretizer is not None else FixedDiscretizer()
         start_info = self.environment.find_start_position()
         if start_info is None:
             raise ValueError("Could not find a valid starting position on the circuit.")
@@ -26,6 +31,7 @@ class Vehicle:
         
         self.image = self._create_image()
         self.sensors = self._create_sensors()
+        self.progress_field = environment.get_progress_field() if PROGRESS_CONFIG["ENABLED"] else None
         
         self.reset()
 
@@ -34,9 +40,19 @@ class Vehicle:
         self.x, self.y = self.initial_position
         self.angle = self.initial_angle
         self.speed = 0
+        self.max_speed = VEHICLE_CONFIG["MAX_SPEED"]
         self.score = 0
         self.collided = False
+        self.terminated = None  # Reason the episode was ended early, if any
         self.last_checkpoint = None
+        self.progress = 0.0  # Position along the lap, from the progress field
+        self.total_progress = 0.0  # Progress since the start, across laps (negative when driving backwards)
+        self.best_progress = 0.0
+        self.direction = 0  # 1 when the last step moved forward along the circuit, -1 backward, 0 otherwise
+        self.laps = 0
+        self.lap_times = []  # Simulated seconds per completed lap
+        self.ticks = 0
+        self.lap_start_tick = 0
         self.last_road_check_time = time.time()
         self.last_speed_check_time = time.time()
 
@@ -49,11 +65,11 @@ class Vehicle:
     def _create_sensors(self):
         """Create the vehicle's sensors."""
         return [
-            Sensor(self, -90, 100),
-            Sensor(self, -45, 150),
-            Sensor(self, 0, 200),
-            Sensor(self, 45, 150),
-            Sensor(self, 90, 100)
+            self.sensor_class(self, -90, 100),
+            self.sensor_class(self, -45, 150),
+            self.sensor_class(self, 0, 200),
+            self.sensor_class(self, 45, 150),
+            self.sensor_class(self, 90, 100)
         ]
 
     def draw(self, window):
@@ -64,11 +80,25 @@ class Vehicle:
         for sensor in self.sensors:
             sensor.draw(window)
 
+    def get_observation(self):
+        """Get the raw, continuous observation of the vehicle: speed and sensor distances."""
+        return (self.speed,) + tuple(sensor.distance for sensor in self.sensors)
+
+    def observation_bounds(self):
+        """
+        Get the range of each observation value and the resolution of the fixed buckets.
+
+        Returns:
+            tuple: (low, high, bucket_widths), one entry per observation value.
+        """
+        low = [0] + [-sensor.length for sensor in self.sensors]
+        high = [VEHICLE_CONFIG["MAX_SPEED"]] + [sensor.length for sensor in self.sensors]
+        bucket_widths = [1] + [10] * len(self.sensors)
+        return low, high, bucket_widths
+
     def get_state(self):
-        """Get the current state of the vehicle."""
-        return (
-            int(self.speed),
-        ) + tuple(int(sensor.distance / 10) for sensor in self.sensors)
+        """Get the current state of the vehicle, discretized by the vehicle's discretizer."""
+        return self.discretizer.discretize(self.get_observation())
 
     @staticmethod
     def normalize_angle(angle):
@@ -203,8 +233,7 @@ class Vehicle:
                 if dx * dx + dy * dy <= radius * radius:
                     check_x, check_y = int(self.x + dx), int(self.y + dy)
                     if self.is_valid_position(check_x, check_y):
-                        color_at_position = self.environment.CIRCUIT_IMAGE.get_at((check_x, check_y))
-                        if color_at_position == self.environment.CHECKPOINT_COLOR:
+                        if self.is_checkpoint(check_x, check_y):
                             position = (check_x, check_y)
                             if position == self.last_checkpoint:
                                 return 0
@@ -222,6 +251,42 @@ class Vehicle:
                                 return 10
         return 0
 
+    def update_progress(self):
+        """
+        Read the progress field at the vehicle's position and update progress, direction and laps.
+
+        Returns:
+            float: Progress made since the last call, in pixels along the circuit.
+        """
+        self.ticks += 1
+        position = self.progress_field.at(self.x, self.y)
+        if position < 0:
+            self.direction = 0
+            return 0.0
+
+        lap_length = self.progress_field.lap_length
+        delta = position - self.progress
+        # A jump of more than half a lap means the start line was crossed
+        if delta < -lap_length / 2:
+            delta += lap_length
+        elif delta > lap_length / 2:
+            delta -= lap_length
+
+        self.progress = position
+        self.total_progress += delta
+        self.best_progress = max(self.best_progress, self.total_progress)
+        self.direction = (delta > 0) - (delta < 0)
+
+        if self.total_progress >= (self.laps + 1) * lap_length:
+            self.laps += 1
+            self.lap_times.append((self.ticks - self.lap_start_tick) / FRAME_RATE)
+            self.lap_start_tick = self.ticks
+        return delta
+
+    def is_checkpoint(self, x, y):
+        """Check if the given (valid, integer) position is on a checkpoint."""
+        return self.environment.CIRCUIT_IMAGE.get_at((x, y)) == self.environment.CHECKPOINT_COLOR
+
     def is_valid_position(self, x, y):
         """Check if the given position is within the screen boundaries."""
         return 0 <= x < self.environment.SCREEN_WIDTH and 0 <= y < self.environment.SCREEN_HEIGHT
@@ -260,9 +325,26 @@ class Vehicle:
         """Calculate the total reward for the vehicle's current state."""
         total_reward = 0
         total_reward += round(self.reward_speed() * self.reward_distance(), 1)
+
+        if self.progress_field is not None:
+            total_reward += round(PROGRESS_CONFIG["REWARD_SCALE"] * self.update_progress(), 1)
         
         if self.collided:
             total_reward -= 25
 
         self.update_score(total_reward)
-        return total_reward
\ No newline at end of file
+        return total_reward
+
+    def terminate(self, reason):
+        """
+        End the episode early, penalizing the score.
+
+        Args:
+            reason (str): The termination rule that fired.
+
+        Returns:
+            float: The penalty, to be added to the reward of the current step.
+        """
+        self.terminated = reason
+        self.update_score(-TERMINATION_CONFIG["PENALTY"])
+        return -TERMINATION_CONFIG["PENALTY"]
\ No newline at end of file
@@ -0,0 +1,104 @@
+import sys
+import os
+import argparse
+from collections import defaultdict, deque
+
+# Add the parent directory to the path (for logs)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from logs.metrics_stream import MetricsSubscriber, DEFAULT_SOCKET_PATH
+
+# (record field, axis label) for each chart
+CHARTS = [
+    ("score", "Score"),
+    ("epsilon", "Exploration rate"),
+    ("steps_per_second", "Steps / second"),
+    ("q_table_size", "Q-table size")
+]
+
+
+class LiveGrapher:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, window=500, refresh_ms=500):
+        """
+        Initialize a live plot of the metrics streamed by running trainers.
+
+        Args:
+            socket_path (str): Path of the socket trainers publish to.
+            window (int): Number of most recent episodes kept per run.
+            refresh_ms (int): Interval between checks for new records, in milliseconds.
+        """
+        self.subscriber = MetricsSubscriber(socket_path)
+        self.window = window
+        self.refresh_ms = refresh_ms
+        self.history = defaultdict(self._new_run)  # run_id -> {field: recent values}
+        self.lines = {}  # (run_id, field) -> Line2D
+
+        self.fig, axes = plt.subplots(len(CHARTS), 1, figsize=(12, 10), sharex=True)
+        self.axes = dict(zip([field for field, _ in CHARTS], axes))
+        for (field, label), ax in zip(CHARTS, axes):
+            ax.set_ylabel(label, fontsize=12)
+            ax.grid(True, linestyle=':', alpha=0.6)
+        axes[-1].set_xlabel("Episode Number", fontsize=12)
+        self.fig.canvas.manager.set_window_title(f"Live training metrics ({socket_path})")
+
+    def _new_run(self):
+        """Return empty rolling buffers for a newly seen run."""
+        return {field: deque(maxlen=self.window) for field in ["episode"] + [field for field, _ in CHARTS]}
+
+    def update(self, _frame=None):
+        """Consume the records received since the last update and redraw only the runs that changed."""
+        records = self.subscriber.poll()
+        if not records:
+            return []
+
+        changed_runs = set()
+        for record in records:
+            run = self.history[record.run_id]
+            run["episode"].append(record.episode)
+            for field, _ in CHARTS:
+                run[field].append(getattr(record, field))
+            changed_runs.add(record.run_id)
+
+        for run_id in changed_runs:
+            run = self.history[run_id]
+            for field, _ in CHARTS:
+                line = self.lines.get((run_id, field))
+                if line is None:
+                    line, = self.axes[field].plot([], [], label=f"run {run_id}")
+                    self.lines[(run_id, field)] = line
+                    self.axes[field].legend(loc='upper left', fontsize=8)
+                line.set_data(run["episode"], run[field])
+
+        for ax in self.axes.values():
+            ax.relim()
+            ax.autoscale_view()
+        return list(self.lines.values())
+
+    def show(self):
+        """Open the window and keep updating it until it is closed."""
+        self.animation = FuncAnimation(self.fig, self.update, interval=self.refresh_ms, cache_frame_data=False)
+        try:
+            plt.show()
+        finally:
+            self.subscriber.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live plot of the metrics published by running trainers.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Socket the trainers publish to.")
+    parser.add_argument("--window", type=int, default=500, help="Episodes kept per run.")
+    args = parser.parse_args(argv)
+
+    try:
+        grapher = LiveGrapher(args.socket, args.window)
+    except FileExistsError as error:
+        print(error)
+        return 1
+    print(f"Listening for training metrics on {args.socket}")
+    grapher.show()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
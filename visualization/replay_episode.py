@@ -0,0 +1,179 @@
+import sys
+import os
+import csv
+import shutil
+import argparse
+import subprocess
+
+# Add the parent directory to the path (for config.py, models and logs)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import QL_CONFIG, FRAME_RATE
+
+TRAJECTORY_FIELDS = ["step", "action", "x", "y", "angle", "speed", "reward", "score", "collided", "terminated"]
+
+
+def replay_episode(episode, on_step=None):
+    """
+    Replay an archived episode headless and regenerate its full trajectory.
+
+    The simulation is deterministic, so applying the recorded action stream to a freshly
+    reset vehicle reproduces the original episode step by step.
+
+    Args:
+        episode (dict): An episode as returned by EpisodeArchive.read.
+        on_step (callable): Optional callback receiving (environment, vehicle, step, remaining_time)
+                            after every physics step, e.g. to render frames.
+
+    Returns:
+        list: One dict per step with the fields listed in TRAJECTORY_FIELDS.
+    """
+    # Imported here so that listing the archive does not need pygame
+    from models.environment import Environment
+    from models.vehicle import Vehicle
+    from models.termination import TerminationMonitor
+
+    environment = Environment(headless=True, track_id=episode["track_id"])
+    vehicle = Vehicle(environment)
+    vehicle.reset()
+    # The same rules that ended the episode live must penalize its last step again
+    termination = TerminationMonitor(environment) if episode["termination"] else None
+
+    trajectory = []
+    for step, action in enumerate(episode["actions"]):
+        vehicle.handle_agent_action(action)
+        reward = vehicle.calculate_reward()
+        if termination is not None and not vehicle.collided:
+            reason = termination.check(vehicle, step + 1)
+            if reason:
+                reward += vehicle.terminate(reason)
+        trajectory.append({
+            "step": step, "action": action, "x": vehicle.x, "y": vehicle.y, "angle": vehicle.angle,
+            "speed": vehicle.speed, "reward": reward, "score": vehicle.score, "collided": vehicle.collided,
+            "terminated": vehicle.terminated
+        })
+        if on_step is not None:
+            on_step(environment, vehicle, step, (episode["num_steps"] - step - 1) / FRAME_RATE)
+    return trajectory
+
+
+def render_frame(environment, vehicle, remaining_time):
+    """Draw one frame exactly like the training loop does."""
+    environment.clear_screen()
+    environment.draw_circuit()
+    vehicle.draw(environment.window)
+    environment.draw_hud(vehicle, remaining_time)
+
+
+def export_trajectory(trajectory, output_path):
+    """Write a trajectory to a CSV file."""
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TRAJECTORY_FIELDS)
+        writer.writeheader()
+        writer.writerows(trajectory)
+
+
+def export_frames(episode, output_directory):
+    """Render every step of an episode to numbered PNG files."""
+    import pygame
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    def save_frame(environment, vehicle, step, remaining_time):
+        render_frame(environment, vehicle, remaining_time)
+        pygame.image.save(environment.window, os.path.join(output_directory, f"frame_{step:06d}.png"))
+
+    return replay_episode(episode, save_frame)
+
+
+def export_video(episode, output_path):
+    """Render an episode to a video file by piping raw frames into ffmpeg."""
+    import pygame
+    from config import WINDOW_CONFIG
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg was not found on the PATH; use --frames to export PNG frames instead.")
+
+    size = f"{WINDOW_CONFIG['WIDTH']}x{WINDOW_CONFIG['HEIGHT']}"
+    ffmpeg = subprocess.Popen(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", size,
+         "-r", str(FRAME_RATE), "-i", "-", "-pix_fmt", "yuv420p", output_path],
+        stdin=subprocess.PIPE
+    )
+
+    def write_frame(environment, vehicle, step, remaining_time):
+        render_frame(environment, vehicle, remaining_time)
+        ffmpeg.stdin.write(pygame.image.tobytes(environment.window, "RGB"))
+
+    try:
+        trajectory = replay_episode(episode, write_frame)
+    finally:
+        ffmpeg.stdin.close()
+        ffmpeg.wait()
+    return trajectory
+
+
+def default_archive_name():
+    """Return the archive written by main.py for the configured Q-table, agent and discretizer."""
+    from logs.logger import get_log_name
+    log_name = get_log_name(QL_CONFIG["Q_TABLE_FILENAME"], QL_CONFIG["AGENT"], QL_CONFIG["DISCRETIZER"])
+    return os.path.join("q_learning", log_name + "_episodes")
+
+
+def main(argv=None):
+    from logs.episode_archive import EpisodeArchive, physics_config_hash
+
+    parser = argparse.ArgumentParser(description="Replay archived episodes headless or export them.")
+    parser.add_argument("--archive", default=default_archive_name(),
+                        help="Archive path relative to the logs directory, without extension.")
+    parser.add_argument("--episode", type=int, default=-1, help="Episode index (negative counts from the end).")
+    parser.add_argument("--list", action="store_true", help="List the archived episodes and exit.")
+    parser.add_argument("--trajectory", help="Write the replayed trajectory to this CSV file.")
+    parser.add_argument("--frames", help="Render every step to PNG files in this directory.")
+    parser.add_argument("--video", help="Render the episode to this video file (requires ffmpeg).")
+    parser.add_argument("--ignore-config", action="store_true",
+                        help="Replay even if the physics, progress or termination settings changed since recording.")
+    args = parser.parse_args(argv)
+
+    # The archive paths are relative to the project root, like the logger's
+    for option in ("trajectory", "frames", "video"):
+        if getattr(args, option):
+            setattr(args, option, os.path.abspath(getattr(args, option)))
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    archive = EpisodeArchive(args.archive)
+
+    config_hash = physics_config_hash()
+    if args.list:
+        for episode_id in range(len(archive)):
+            entry = archive.read_entry(episode_id)
+            changed = "" if entry["config_hash"] == config_hash else " (recorded with other settings)"
+            print(f"{episode_id}: seed={entry['seed']} track={entry['track_id']} steps={entry['num_steps']} "
+                  f"score={entry['score']} bytes={entry['length']}{changed}")
+        return
+
+    episode = archive.read(args.episode)
+    # The same actions under other settings produce a different episode
+    if episode["config_hash"] != config_hash:
+        if not args.ignore_config:
+            print("This episode was recorded with other vehicle, progress or termination settings, so replaying "
+                  "it would not reproduce it. Restore those settings, or pass --ignore-config to replay anyway.")
+            return 1
+        print("Warning: replaying an episode recorded with other vehicle, progress or termination settings.")
+    if args.video:
+        trajectory = export_video(episode, args.video)
+    elif args.frames:
+        trajectory = export_frames(episode, args.frames)
+    else:
+        trajectory = replay_episode(episode)
+
+    if args.trajectory:
+        export_trajectory(trajectory, args.trajectory)
+
+    final = trajectory[-1] if trajectory else {"score": 0, "collided": False}
+    print(f"Replayed {len(trajectory)} steps. Score: {final['score']} Collided: {final['collided']}")
+    if round(final["score"], 1) != round(episode["score"], 1):
+        print(f"Warning: the episode scored {episode['score']} when it was recorded.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
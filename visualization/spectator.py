@@ -0,0 +1,91 @@
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path (for config.py and models)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from models.environment import Environment
+from models.vehicle import Vehicle
+from models.snapshot_buffer import SnapshotBuffer, DEFAULT_BUFFER_NAME
+
+
+def apply_snapshot(vehicle, snapshot):
+    """Copy a snapshot into a vehicle so the regular drawing code can render it."""
+    vehicle.x, vehicle.y = snapshot["x"], snapshot["y"]
+    vehicle.angle, vehicle.speed, vehicle.score = snapshot["angle"], snapshot["speed"], snapshot["score"]
+    is_on_road = vehicle.is_on_road(vehicle.x, vehicle.y)
+    for sensor, distance in zip(vehicle.sensors, snapshot["sensors"]):
+        sensor.distance = distance
+        sensor.is_on_road = is_on_road
+        sensor.update_endpoint()
+
+
+def watch(buffer_name=DEFAULT_BUFFER_NAME, fps=30):
+    """
+    Attach to a running trainer's snapshot buffer and render it until the window is closed.
+
+    The viewer samples the latest snapshot at its own frame rate; the trainer never waits for it.
+
+    Args:
+        buffer_name (str): Name of the trainer's shared memory buffer.
+        fps (int): Frames per second to render at.
+    """
+    try:
+        buffer = SnapshotBuffer(buffer_name)
+    except FileNotFoundError:
+        print(f"No running trainer publishes to '{buffer_name}'. Start one with: cli.py train --headless --spectate")
+        return
+
+    environment = Environment(track_id=buffer.track_id)
+    caption = f"Self Driving AI - spectating '{buffer_name}'"
+    pygame.display.set_caption(caption)
+    vehicle = Vehicle(environment)
+    clock = pygame.time.Clock()
+    remaining_time = 0
+    last_sequence = None
+    frames_without_update = 0
+
+    try:
+        run = True
+        while run:
+            clock.tick(fps)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    run = False
+
+            snapshot = buffer.read()
+            if snapshot is not None and snapshot["sequence"] != last_sequence:
+                apply_snapshot(vehicle, snapshot)
+                remaining_time = snapshot["remaining_time"]
+                last_sequence = snapshot["sequence"]
+                if frames_without_update > 2 * fps:
+                    pygame.display.set_caption(caption)
+                frames_without_update = 0
+            else:
+                frames_without_update += 1
+                if frames_without_update == 2 * fps + 1:
+                    pygame.display.set_caption(f"{caption} (no updates, trainer stopped?)")
+
+            environment.clear_screen()
+            environment.draw_circuit()
+            vehicle.draw(environment.window)
+            environment.draw_hud(vehicle, remaining_time)
+            pygame.display.update()
+    finally:
+        # Detach only: the trainer owns the buffer
+        buffer.close()
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a running headless trainer.")
+    parser.add_argument("--name", default=DEFAULT_BUFFER_NAME, help="Snapshot buffer name used by the trainer.")
+    parser.add_argument("--fps", type=int, default=30, help="Frames per second to render at.")
+    args = parser.parse_args(argv)
+    watch(args.name, args.fps)
+
+
+if __name__ == "__main__":
+    main()